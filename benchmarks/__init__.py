@@ -0,0 +1,6 @@
+"""
+Reproducible performance benchmarks for the QA bot.
+
+Run ``python -m benchmarks --help`` from the project root, and compare two
+result files with ``python -m benchmarks.compare old.json new.json``.
+"""
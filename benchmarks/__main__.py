@@ -0,0 +1,58 @@
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from .fixture_site import SiteConfig
+from .suite import BENCHMARKS
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Run the QA bot benchmarks.")
+    parser.add_argument('benchmarks', nargs='*', metavar='benchmark',
+                        help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all).")
+    parser.add_argument('--output', default='bench_results.json', help="Where to write the JSON report.")
+    parser.add_argument('--rows', type=int, default=1000, help="Test cases seeded for the export and list benchmarks.")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per benchmark.")
+    parser.add_argument('--forms', type=int, default=SiteConfig.forms)
+    parser.add_argument('--buttons', type=int, default=SiteConfig.buttons)
+    parser.add_argument('--links', type=int, default=SiteConfig.links)
+    parser.add_argument('--depth', type=int, default=SiteConfig.depth)
+    parser.add_argument('--js-rendered', type=float, default=SiteConfig.js_rendered,
+                        help="Fraction of fixture pages rendered by JavaScript.")
+    parser.add_argument('--latency', type=float, default=SiteConfig.latency,
+                        help="Seconds of artificial latency per fixture request.")
+    parser.add_argument('--seed', type=int, default=SiteConfig.seed)
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'conf.settings')
+    import django
+    django.setup()
+    from .suite import run
+
+    site_config = SiteConfig(
+        forms=args.forms, buttons=args.buttons, links=args.links, depth=args.depth,
+        js_rendered=args.js_rendered, latency=args.latency, seed=args.seed,
+    )
+    report = run(args.benchmarks or BENCHMARKS, rows=args.rows, repeat=args.repeat, site_config=site_config)
+
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2, sort_keys=True)
+
+    for name, result in report['results'].items():
+        if 'skipped' in result:
+            print(f"{name:<24} skipped: {result['skipped']}")
+        else:
+            print(f"{name:<24} median {result['median'] * 1000:10.2f} ms  min {result['min'] * 1000:10.2f} ms")
+    print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Compares two benchmark reports and exits non-zero when any benchmark's
+median got slower than the allowed threshold.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 1.10
+"""
+import argparse
+import json
+import sys
+
+
+def compare(baseline, candidate, threshold):
+    rows = []
+    regressions = []
+    for name in sorted(set(baseline['results']) | set(candidate['results'])):
+        old = baseline['results'].get(name, {})
+        new = candidate['results'].get(name, {})
+        if 'median' not in old or 'median' not in new:
+            rows.append((name, old.get('median'), new.get('median'), None))
+            continue
+        ratio = new['median'] / old['median'] if old['median'] else float('inf')
+        rows.append((name, old['median'], new['median'], ratio))
+        if ratio > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def _ms(value):
+    return f"{value * 1000:10.2f}" if value is not None else f"{'-':>10}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.compare', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=1.10,
+                        help="Largest accepted candidate/baseline median ratio (default: 1.10).")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as baseline, open(args.candidate) as candidate:
+        rows, regressions = compare(json.load(baseline), json.load(candidate), args.threshold)
+
+    print(f"{'benchmark':<24} {'base ms':>10} {'new ms':>10} {'ratio':>7}")
+    for name, old, new, ratio in rows:
+        print(f"{name:<24} {_ms(old)} {_ms(new)} {ratio:7.2f}" if ratio is not None
+              else f"{name:<24} {_ms(old)} {_ms(new)} {'-':>7}")
+
+    if regressions:
+        print(f"Regressed beyond {args.threshold:.2f}x: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Synthetic websites for benchmarking the crawler.
+
+``generate_site`` builds a deterministic set of pages with a configurable
+number of forms, buttons and links per page, a tree of pages ``depth`` levels
+deep, and optionally JavaScript-rendered pages whose markup only exists after
+the scripts have run. ``FixtureServer`` serves such a site from memory on a
+local port with optional artificial latency per request; its pages can
+also be read without a network through ``web_api.testing.StaticDriver``.
+"""
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+@dataclass
+class SiteConfig:
+    forms: int = 2
+    buttons: int = 3
+    links: int = 5
+    inputs_per_form: int = 3
+    depth: int = 1
+    children_per_page: int = 2
+    js_rendered: float = 0.0  # Fraction of pages rendered client-side.
+    shared_header: bool = True  # Navigation and footer repeated on every page.
+    latency: float = 0.0  # Seconds added to every response.
+    seed: int = 0
+
+
+def _page_paths(config):
+    paths = ['/']
+    level = ['/']
+    for _ in range(config.depth):
+        next_level = []
+        for parent in level:
+            for i in range(config.children_per_page):
+                next_level.append(f"{parent.rstrip('/')}/p{i}/")
+        paths.extend(next_level)
+        level = next_level
+    return paths
+
+
+def _shared_header(paths):
+    items = ''.join(f'<a href="{path}">Page {i}</a>' for i, path in enumerate(paths[:5]))
+    return (
+        f'<nav class="site-nav">{items}</nav>'
+        '<div class="cookie-banner"><button class="accept-cookies" type="button">Accept</button></div>'
+    )
+
+
+def _shared_footer():
+    return '<footer class="site-footer"><a href="/about/">About</a><a href="/contact/">Contact</a></footer>'
+
+
+def _static_body(path, index, config, paths, rng):
+    parts = [f'<h1>Page {index}</h1>']
+    for f in range(config.forms):
+        inputs = ''.join(
+            f'<input type="text" name="field_{f}_{i}">' for i in range(config.inputs_per_form)
+        )
+        parts.append(
+            f'<form id="form-{index}-{f}" name="form_{index}_{f}" action="/submitted/" method="get">'
+            f'{inputs}<input type="submit" value="Send"></form>'
+        )
+    for b in range(config.buttons):
+        handler = ' onclick="alert(\'clicked\')"' if b % 2 else ''
+        parts.append(f'<button id="button-{index}-{b}" type="button"{handler}>Action {index}-{b}</button>')
+    for link in range(config.links):
+        target = rng.choice(paths)
+        parts.append(f'<a href="{target}">Link {index}-{link}</a>')
+    return ''.join(parts)
+
+
+def _js_body(static_body):
+    # The markup is injected by a script so only a real browser sees it.
+    escaped = static_body.replace('\\', '\\\\').replace('`', '\\`')
+    return (
+        '<div id="app"></div>'
+        f'<script>window.addEventListener("DOMContentLoaded", function () {{'
+        f'document.getElementById("app").innerHTML = `{escaped}`; }});</script>'
+    )
+
+
+def generate_site(config=None):
+    """
+    Returns a dict mapping URL paths to HTML documents.
+    """
+    config = config or SiteConfig()
+    rng = random.Random(config.seed)
+    paths = _page_paths(config)
+    pages = {}
+
+    for index, path in enumerate(paths):
+        body = _static_body(path, index, config, paths, rng)
+        if rng.random() < config.js_rendered:
+            body = _js_body(body)
+        if config.shared_header:
+            body = _shared_header(paths) + body + _shared_footer()
+        pages[path] = f'<!DOCTYPE html><html><head><title>Page {index}</title></head><body>{body}</body></html>'
+
+    for path in ('/submitted/', '/about/', '/contact/'):
+        pages.setdefault(path, f'<!DOCTYPE html><html><body><h1>{path.strip("/")}</h1></body></html>')
+    return pages
+
+
+class FixtureServer:
+    """
+    Serves a generated site on 127.0.0.1 from a background thread. Usable as
+    a context manager; ``url`` is the address of the root page.
+    """
+
+    def __init__(self, pages, latency=0.0, port=0):
+        self.pages = pages
+        self.latency = latency
+        self.requests = 0
+        handler = self._handler()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                page = server.pages.get(urlsplit(self.path).path)
+                if page is None:
+                    self.send_error(404)
+                    return
+                body = page.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,59 @@
+"""
+Startup cost of the web tier: import time, peak RSS and which heavy crawler
+dependencies end up loaded in a fresh WSGI/ASGI worker process.
+"""
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Dependencies that only the crawler, runner and Excel import/export need.
+HEAVY_MODULES = ('selenium', 'openpyxl', 'bs4')
+
+# Runs in a fresh interpreter: boot the application, then resolve the URLconf
+# as the first request would, which imports the views.
+CHILD = """
+import json, resource, sys, time
+started = time.perf_counter()
+import {module}
+booted = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+resolved = time.perf_counter()
+print(json.dumps({{
+    'boot': booted - started,
+    'first_request': resolved - started,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'heavy_modules': sorted(name for name in {heavy!r} if name in sys.modules),
+    'modules': len(sys.modules),
+}}))
+"""
+
+
+def measure_startup(module, repeat=5):
+    """
+    Imports ``module`` (``conf.wsgi`` or ``conf.asgi``) in ``repeat`` fresh
+    processes and returns timing statistics for boot and URLconf loading.
+    """
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', CHILD.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    first_request = [run['first_request'] for run in runs]
+    return {
+        'repeat': repeat,
+        'min': min(first_request),
+        'median': statistics.median(first_request),
+        'mean': statistics.fmean(first_request),
+        'boot_median': statistics.median(run['boot'] for run in runs),
+        'max_rss_kb': statistics.median(run['max_rss_kb'] for run in runs),
+        'modules': runs[-1]['modules'],
+        'heavy_modules': runs[-1]['heavy_modules'],
+    }
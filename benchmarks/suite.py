@@ -0,0 +1,270 @@
+"""
+Benchmarks for the crawl, persistence, component dedup, export and list API
+paths, and for web worker startup.
+
+Each benchmark returns a dict of measurements; ``run`` collects them into a
+JSON-serialisable report. Browser-backed benchmarks are reported as skipped
+when Chrome cannot be started or fails during the run.
+"""
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from .fixture_site import FixtureServer, SiteConfig, generate_site
+from .startup import measure_startup
+
+
+def measure(func, repeat):
+    """
+    Calls ``func`` ``repeat`` times and returns timing statistics in seconds
+    along with the value returned by the last call.
+    """
+    timings = []
+    value = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = func()
+        timings.append(time.perf_counter() - started)
+    return {
+        'repeat': repeat,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.fmean(timings),
+    }, value
+
+
+def browser_available():
+    # Started the way the crawler starts it, which is not headless.
+    try:
+        from selenium import webdriver
+        webdriver.Chrome().quit()
+    except Exception as e:
+        return False, f"Chrome is not available: {type(e).__name__}"
+    return True, None
+
+
+def run_browser_bench(bench, site_config, repeat):
+    """
+    Runs a browser-backed benchmark, reporting it as skipped if the browser
+    fails partway instead of aborting the whole run.
+    """
+    from selenium.common.exceptions import WebDriverException
+
+    try:
+        return bench(site_config, repeat)
+    except WebDriverException as e:
+        return {'skipped': f"Chrome failed: {type(e).__name__}: {e.msg}"}
+
+
+def seed_test_cases(rows):
+    """
+    Inserts ``rows`` scenarios with one test case each, shaped like the
+    output of store_features_in_db, and returns the web application.
+    """
+    from web_api.models import WebApplication, Feature, TestScenario, TestCase
+
+    web_application = WebApplication.objects.create(name='Benchmark', url='http://127.0.0.1/')
+    features = Feature.objects.bulk_create([
+        Feature(web_application=web_application, name='Forms', description=f"Form with fields: field_{i}")
+        for i in range(rows)
+    ])
+    scenarios = TestScenario.objects.bulk_create([
+        TestScenario(
+            web_application=web_application,
+            feature=feature,
+            scenario_id=f"TS_BENCH_{web_application.id}_{feature.id}",
+            description=f"Validating form 'form_{i}' submission.",
+            purpose=f"Ensure that form 'form_{i}' handles input data and submission correctly.",
+        )
+        for i, feature in enumerate(features)
+    ])
+    TestCase.objects.bulk_create([
+        TestCase(
+            test_scenario=scenario,
+            test_case_id=f"TC_FORM_{scenario.feature_id}_001",
+            description=f"Verify that the form 'form_{i}' submits correctly with valid data.",
+            pre_conditions=f"The form 'form_{i}' is visible and accessible on the page.",
+            test_steps=f"1. Fill out the form 'form_{i}' with valid data.\n2. Submit the form.",
+            test_data="Input valid data in the form fields.",
+            expected_result="Form is submitted successfully, and user receives confirmation.",
+            post_conditions="Form data is saved correctly.",
+            priority='High',
+            test_environment="Browser: Chrome, OS: Windows 10",
+            test_case_type="",
+            tester_name="Auto Generated",
+        )
+        for i, scenario in enumerate(scenarios)
+    ], batch_size=1000)
+    return web_application
+
+
+def bench_crawl(site_config, repeat):
+    from web_api.crawler import fetch_features_from_url
+
+    with FixtureServer(generate_site(site_config), latency=site_config.latency) as server:
+        timing, features = measure(lambda: fetch_features_from_url(server.url), repeat)
+        timing['http_requests'] = server.requests
+    timing['features'] = {kind: len(items) for kind, items in features.items()}
+    return timing
+
+
+def bench_persist(site_config, repeat):
+    from web_api.models import WebApplication, TestCase
+    from web_api.crawler import fetch_features_from_url, store_features_in_db
+
+    with FixtureServer(generate_site(site_config), latency=site_config.latency) as server:
+        features = fetch_features_from_url(server.url)
+
+        def persist():
+            # Start from an empty application every time: its components from
+            # a previous repeat would skip scenario and case generation.
+            WebApplication.objects.filter(url=server.url).delete()
+            web_application = WebApplication.objects.create(name='Benchmark', url=server.url)
+            store_features_in_db(web_application, features)
+            return web_application
+
+        timing, web_application = measure(persist, repeat)
+    timing['test_cases'] = TestCase.objects.filter(test_scenario__web_application=web_application).count()
+    return timing
+
+
+class NoDeduplication:
+    """
+    Drop-in for ComponentDeduplicator that shares nothing, so every element is
+    analyzed and stored on its own as before component deduplication.
+    """
+
+    def split(self, kind, elements, page_url=None):
+        return list(elements), None, []
+
+
+def bench_dedup(site_config, repeat):
+    """
+    Crawls every page of the fixture site into one web application through
+    fetch_features_from_url and store_features_in_db, with and without
+    component deduplication. The browser is replaced by StaticDriver, so
+    interactions are attempted but not performed; rows are counted from the
+    database and browser sessions and interactions from the driver.
+    """
+    from unittest import mock
+    from web_api.crawler import fetch_features_from_url, store_features_in_db
+    from web_api.dedup import ComponentDeduplicator
+    from web_api.models import WebApplication, Feature, TestScenario, TestCase
+    from web_api.testing import StaticDriver
+
+    pages = generate_site(site_config)
+    root = 'http://fixture.test/'
+    urls = [root + path.lstrip('/') for path in pages]
+
+    def crawl_all(deduplicate):
+        WebApplication.objects.filter(url=root).delete()
+        web_application = WebApplication.objects.create(name='Benchmark', url=root)
+        driver = StaticDriver.factory(pages)
+        with mock.patch('selenium.webdriver.Chrome', driver):
+            for url in urls:
+                deduplicator = ComponentDeduplicator(web_application) if deduplicate else NoDeduplication()
+                store_features_in_db(web_application, fetch_features_from_url(url, deduplicator))
+        return {
+            'features': Feature.objects.filter(web_application=web_application).count(),
+            'test_scenarios': TestScenario.objects.filter(web_application=web_application).count(),
+            'test_cases': TestCase.objects.filter(test_scenario__web_application=web_application).count(),
+            'interactions': driver.counters['interactions'],
+            'browser_sessions': driver.counters['sessions'],
+        }
+
+    timing, with_dedup = measure(lambda: crawl_all(True), repeat)
+    without_timing, without_dedup = measure(lambda: crawl_all(False), repeat)
+    timing['with_dedup'] = with_dedup
+    timing['without_dedup'] = {**without_dedup, 'median': without_timing['median']}
+    timing['pages'] = len(pages)
+    return timing
+
+
+def bench_export(client, web_application, repeat):
+    timing, response = measure(
+        lambda: client.get('/webapis/export-tcts/', {'web_app_id': web_application.id}), repeat
+    )
+    timing['status_code'] = response.status_code
+    timing['bytes'] = len(response.content)
+    return timing
+
+
+def bench_list(client, path, repeat):
+    timing, response = measure(lambda: client.get(path), repeat)
+    timing['status_code'] = response.status_code
+    timing['bytes'] = len(response.content)
+    return timing
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+BENCHMARKS = ('crawl', 'persist', 'dedup', 'export', 'list', 'startup')
+
+
+def run(selected=BENCHMARKS, rows=1000, repeat=5, site_config=None):
+    """
+    Runs the selected benchmarks against a throwaway test database and returns
+    the report. Django must already be configured.
+    """
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    site_config = site_config or SiteConfig()
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'rows': rows,
+            'repeat': repeat,
+            'site': vars(site_config),
+        },
+        'results': {},
+    }
+    results = report['results']
+
+    if 'startup' in selected:
+        # Fresh interpreters, independent of the test database below.
+        for module in ('conf.wsgi', 'conf.asgi'):
+            results[f"startup_{module.split('.')[-1]}"] = measure_startup(module, repeat)
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        if {'crawl', 'persist'}.intersection(selected):
+            available, reason = browser_available()
+            for name, bench in (('crawl', bench_crawl), ('persist', bench_persist)):
+                if name in selected:
+                    results[name] = run_browser_bench(bench, site_config, repeat) if available else {'skipped': reason}
+
+        if 'dedup' in selected:
+            results['dedup'] = bench_dedup(site_config, repeat)
+
+        if {'export', 'list'}.intersection(selected):
+            web_application = seed_test_cases(rows)
+            client = Client()
+            if 'export' in selected:
+                results['export'] = bench_export(client, web_application, repeat)
+            if 'list' in selected:
+                for name, path in (
+                    ('list_web_applications', '/webapis/api/web-applications/list/'),
+                    ('list_test_scenarios', '/webapis/test_scenarios/'),
+                    ('list_test_cases', '/webapis/test_cases/'),
+                ):
+                    results[name] = bench_list(client, path, repeat)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    return report
@@ -123,3 +123,7 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Full-text search backend for web_api.search, as a dotted path to a
+# BaseSearchBackend subclass. Defaults to SQLite FTS5 on SQLite databases.
+# SEARCH_BACKEND = "web_api.search.SQLiteFTS5Backend"
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import WebApplication, Feature, TestScenario, TestCase
+from .models import WebApplication, Component, CrawlJob, Feature, TestScenario, TestCase, TestCaseStat
 # Register your models here.
 
 
@@ -10,7 +10,27 @@ class WebApplicationAdmin(admin.ModelAdmin):
     ordering = ('-created_at',)
 
 
+class ComponentAdmin(admin.ModelAdmin):
+    list_display = ('id', 'web_application', 'kind', 'signature', 'description', 'created_at')
+    search_fields = ('signature', 'description')
+    list_filter = ('kind', 'web_application')
+
+
+class CrawlJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'web_application', 'url', 'status', 'processed', 'total', 'updated_at')
+    list_filter = ('status',)
+    ordering = ('-created_at',)
+
+
+class TestCaseStatAdmin(admin.ModelAdmin):
+    list_display = ('web_application', 'dimension', 'value', 'count')
+    list_filter = ('dimension',)
+
+
 admin.site.register(WebApplication, WebApplicationAdmin)
+admin.site.register(Component, ComponentAdmin)
 admin.site.register(Feature)
 admin.site.register(TestScenario)
 admin.site.register(TestCase)
+admin.site.register(TestCaseStat, TestCaseStatAdmin)
+admin.site.register(CrawlJob, CrawlJobAdmin)
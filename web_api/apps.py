@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_migrate
+
+
+def create_search_index(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    # Search backends index the default database only.
+    if using != DEFAULT_DB_ALIAS:
+        return
+    from .search import get_search_backend
+    get_search_backend().setup()
 
 
 class WebApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "web_api"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        # The search index is not a model, so migrate creates it through this hook.
+        post_migrate.connect(create_search_index, sender=self)
@@ -0,0 +1,171 @@
+import time
+from datetime import timedelta
+
+from bs4 import BeautifulSoup
+from django.db import transaction
+from django.utils import timezone
+from selenium import webdriver
+
+from .models import CrawlJob
+from .dedup import ComponentDeduplicator, element_signature
+from .crawler import analyze_forms, analyze_buttons, analyze_links, store_feature
+
+# Feature type -> (tag, analyzer) in the order fetch_features_from_url uses.
+FEATURE_TYPES = {
+    'forms': ('form', analyze_forms),
+    'buttons': ('button', analyze_buttons),
+    'links': ('a', analyze_links),
+}
+
+CHECKPOINT_SECONDS = 60
+# A running job that has not checkpointed for this long is presumed dead.
+STALE_AFTER_SECONDS = 5 * CHECKPOINT_SECONDS
+
+
+def start_crawl(web_application, **kwargs):
+    """
+    Creates a crawl job for the web application and runs it to completion.
+    The job is created running, so resume_crawls leaves it to this process.
+    """
+    job = CrawlJob.objects.create(web_application=web_application, url=web_application.url, status='running')
+    return run_crawl(job, **kwargs)
+
+
+def resumable_jobs(stale_after=STALE_AFTER_SECONDS):
+    """
+    Unfinished crawl jobs that no live process is working on: running jobs
+    only count once they have not saved any progress for ``stale_after``
+    seconds.
+    """
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    return CrawlJob.objects.exclude(status='completed').exclude(status='running', updated_at__gt=cutoff)
+
+
+def claim(job_id, stale_after=STALE_AFTER_SECONDS):
+    """
+    Marks a resumable job as running for this process and returns it, or
+    returns None if it finished or another process claimed it first.
+    """
+    with transaction.atomic():
+        job = resumable_jobs(stale_after).select_for_update().filter(pk=job_id).first()
+        if job is None:
+            return None
+        # Conditional so that only one claim wins where rows are not locked.
+        claimed = resumable_jobs(stale_after).filter(pk=job_id).update(status='running', updated_at=timezone.now())
+    return job if claimed else None
+
+
+def heartbeat(job):
+    CrawlJob.objects.filter(pk=job.pk).update(updated_at=timezone.now())
+
+
+def _parse(driver, url):
+    driver.get(url)
+    soup = BeautifulSoup(driver.page_source, 'html.parser')
+    return {feature_type: soup.find_all(tag) for feature_type, (tag, _) in FEATURE_TYPES.items()}
+
+
+def _plan(job, elements, page_url):
+    """
+    Fills the frontier of a new job. Components known from earlier crawls of
+    the application go straight into the results since they are not
+    interacted with again.
+    """
+    deduplicator = ComponentDeduplicator(job.web_application)
+    for feature_type, found in elements.items():
+        new, signatures, shared = deduplicator.split(feature_type, found, page_url)
+        indexes = {id(element): index for index, element in enumerate(found)}
+        for element, signature in zip(new, signatures):
+            job.frontier.append({'type': feature_type, 'index': indexes[id(element)], 'signature': signature})
+        for feature in shared:
+            feature['idempotency_key'] = f"crawl-{job.id}-{feature_type}-{feature['signature']}"
+            job.results.setdefault(feature_type, []).append(feature)
+    job.total = len(job.frontier)
+
+
+def _locate(elements, item, page_url):
+    """
+    Finds a frontier item on the freshly parsed page, by position first and
+    by signature if the page changed since the checkpoint.
+    """
+    found = elements[item['type']]
+    index = item['index']
+    if index < len(found) and element_signature(item['type'], found[index], page_url) == item['signature']:
+        return found[index]
+    for element in found:
+        if element_signature(item['type'], element, page_url) == item['signature']:
+            return element
+    return None
+
+
+def checkpoint(job):
+    """
+    Persists the features analyzed since the last checkpoint and saves the
+    crawl state. Stored features are dropped from ``results`` so that every
+    checkpoint writes a bounded amount of state; they carry idempotency keys,
+    so replaying a checkpoint that was not saved never duplicates rows.
+    """
+    for feature_type, features in job.results.items():
+        for feature in features:
+            store_feature(job.web_application, feature_type, feature)
+            # Generating scenarios is slow; keep the job's lease fresh.
+            heartbeat(job)
+    job.results = {}
+    job.save(update_fields=['status', 'frontier', 'results', 'total', 'processed', 'error', 'updated_at'])
+
+
+def run_crawl(job, checkpoint_every=25, checkpoint_seconds=CHECKPOINT_SECONDS):
+    """
+    Runs or resumes a crawl job. State is checkpointed every
+    ``checkpoint_every`` elements or ``checkpoint_seconds`` seconds, whichever
+    comes first; a job interrupted at any point can be passed back in to
+    continue from its last checkpoint.
+    """
+    job.status = 'running'
+    job.error = ''
+    job.save(update_fields=['status', 'error', 'updated_at'])
+
+    driver = None
+    try:
+        driver = webdriver.Chrome()
+        elements = _parse(driver, job.url)
+        page_url = driver.current_url
+        if not job.frontier and not job.results and not job.processed:
+            _plan(job, elements, page_url)
+            checkpoint(job)
+
+        last_checkpoint = time.monotonic()
+        since_checkpoint = 0
+        while job.frontier:
+            item = job.frontier[0]
+            if driver.current_url != page_url:
+                # The previous interaction navigated away
+                elements = _parse(driver, job.url)
+                page_url = driver.current_url
+
+            element = _locate(elements, item, page_url)
+            if element is not None:
+                _, analyzer = FEATURE_TYPES[item['type']]
+                for feature in analyzer(driver, [element], [item['signature']]):
+                    feature['idempotency_key'] = f"crawl-{job.id}-{item['type']}-{item['signature']}"
+                    job.results.setdefault(item['type'], []).append(feature)
+
+            job.frontier.pop(0)
+            job.processed += 1
+            since_checkpoint += 1
+            if since_checkpoint >= checkpoint_every or time.monotonic() - last_checkpoint >= checkpoint_seconds:
+                checkpoint(job)
+                last_checkpoint = time.monotonic()
+                since_checkpoint = 0
+
+        job.status = 'completed'
+        checkpoint(job)
+    except Exception as e:
+        job.status = 'failed'
+        job.error = str(e)
+        job.save(update_fields=['status', 'error', 'frontier', 'results', 'processed', 'updated_at'])
+        raise
+    finally:
+        if driver is not None:
+            driver.quit()
+    return job
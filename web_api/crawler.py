@@ -1,41 +1,44 @@
-import openpyxl
-from openpyxl.styles import Font
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoAlertPresentException, NoSuchElementException, TimeoutException
 from bs4 import BeautifulSoup
-from .models import Feature, TestScenario, TestCase
+from .models import Component, Feature, TestScenario, TestCase
+from .dedup import ComponentDeduplicator
 from datetime import date
 
 
-def fetch_features_from_url(url):
+def fetch_features_from_url(url, deduplicator=None):
     driver = webdriver.Chrome()
     driver.get(url)
     features_data = {}
+    # Components already seen in this crawl or stored from earlier crawls of
+    # the same web application are referenced instead of interacted with again.
+    deduplicator = deduplicator or ComponentDeduplicator()
 
     # Extract HTML
     page_source = driver.page_source
+    page_url = driver.current_url
     soup = BeautifulSoup(page_source, 'html.parser')
 
     # Analyze Forms
-    forms = soup.find_all('form')
-    features_data['forms'] = analyze_forms(driver, forms)
+    forms, form_signatures, shared_forms = deduplicator.split('forms', soup.find_all('form'), page_url)
+    features_data['forms'] = analyze_forms(driver, forms, form_signatures) + shared_forms
 
     # Analyze Buttons
-    buttons = soup.find_all('button')
-    features_data['buttons'] = analyze_buttons(driver, buttons)
+    buttons, button_signatures, shared_buttons = deduplicator.split('buttons', soup.find_all('button'), page_url)
+    features_data['buttons'] = analyze_buttons(driver, buttons, button_signatures) + shared_buttons
 
     # Analyze Links
-    links = soup.find_all('a')
-    features_data['links'] = analyze_links(driver, links)
+    links, link_signatures, shared_links = deduplicator.split('links', soup.find_all('a'), page_url)
+    features_data['links'] = analyze_links(driver, links, link_signatures) + shared_links
 
     driver.quit()
     return features_data
 
 
-def analyze_forms(driver, forms):
+def analyze_forms(driver, forms, signatures=None):
     form_data = []
     for i, form in enumerate(forms):
         form_id = form.get('id', f'form-{i}')
@@ -70,13 +73,14 @@ def analyze_forms(driver, forms):
             "form_id": form_id,
             "form_action": form_action,
             "description": f"Form with fields: {', '.join(field_names)}",
-            "status": status
+            "status": status,
+            "signature": signatures[i] if signatures else None
         }
         form_data.append(form_info)
     return form_data
 
 
-def analyze_buttons(driver, buttons):
+def analyze_buttons(driver, buttons, signatures=None):
     button_data = []
     for i, button in enumerate(buttons):
         button_text = button.get_text(strip=True) or f'button-{i}'
@@ -112,13 +116,14 @@ def analyze_buttons(driver, buttons):
             "button_text": button_text,
             "button_id": button_id,
             "description": f"Button labeled '{button_text}' with ID '{button_id or 'N/A'}'",
-            "status": status
+            "status": status,
+            "signature": signatures[i] if signatures else None
         }
         button_data.append(button_info)
     return button_data
 
 
-def analyze_links(driver, links):
+def analyze_links(driver, links, signatures=None):
     link_data = []
     for i, link in enumerate(links):
         link_text = link.get_text(strip=True) or f'link-{i}'
@@ -141,7 +146,8 @@ def analyze_links(driver, links):
             "link_text": link_text,
             "href": href,
             "description": f"Link pointing to '{href}'",
-            "status": status
+            "status": status,
+            "signature": signatures[i] if signatures else None
         }
         link_data.append(link_info)
     return link_data
@@ -150,14 +156,48 @@ def analyze_links(driver, links):
 def store_features_in_db(web_application, features):
     for feature_type, feature_list in features.items():
         for feature in feature_list:
-            new_feature = Feature.objects.create(
-                web_application=web_application,
-                name=feature_type.capitalize(),
-                description=feature['description']
-            )
-            # Generate Test Scenario and Test Case
-            generate_test_scenario(web_application, new_feature)
-            generate_test_case(web_application, new_feature)
+            store_feature(web_application, feature_type, feature)
+
+
+def store_feature(web_application, feature_type, feature):
+    component = None
+    if feature.get('signature'):
+        component, _ = Component.objects.get_or_create(
+            web_application=web_application,
+            signature=feature['signature'],
+            defaults={
+                'kind': feature_type,
+                'description': feature['description'],
+                'status': feature.get('status', ''),
+            }
+        )
+
+    values = {
+        'web_application': web_application,
+        'component': component,
+        'name': feature_type.capitalize(),
+        'description': feature['description'],
+    }
+    if feature.get('idempotency_key'):
+        # Replaying a checkpointed crawl must not duplicate the feature
+        new_feature, _ = Feature.objects.get_or_create(idempotency_key=feature['idempotency_key'], defaults=values)
+    else:
+        new_feature = Feature.objects.create(**values)
+
+    # Shared components keep the scenario and case generated the first time,
+    # and a resumed crawl only fills in what the interrupted run left out
+    if component is not None:
+        scenarios = TestScenario.objects.filter(feature__component=component)
+    else:
+        scenarios = TestScenario.objects.filter(feature=new_feature)
+
+    # Generate Test Scenario and Test Case
+    scenario = scenarios.order_by('id').first()
+    if scenario is None:
+        scenario = generate_test_scenario(web_application, new_feature)
+    if scenario is not None and not scenario.test_cases.exists():
+        generate_test_case(web_application, new_feature, scenario)
+    return new_feature
 
 
 def generate_test_scenario(web_application, feature):
@@ -202,7 +242,7 @@ def generate_test_scenario(web_application, feature):
     scenario_id = f"TS_{feature.name.upper()}_{feature.id}"
 
     # Create the Test Scenario
-    TestScenario.objects.create(
+    scenario = TestScenario.objects.create(
         web_application=web_application,
         feature=feature,
         scenario_id=scenario_id,
@@ -211,13 +251,16 @@ def generate_test_scenario(web_application, feature):
     )
 
     driver.quit()
+    return scenario
 
 
-def generate_test_case(web_application, feature):
+def generate_test_case(web_application, feature, scenario=None):
     driver = webdriver.Chrome()
     driver.get(web_application.url)
 
-    scenario = TestScenario.objects.filter(web_application=web_application, feature=feature).first()
+    # A shared component's scenario may belong to an earlier feature
+    if scenario is None:
+        scenario = TestScenario.objects.filter(web_application=web_application, feature=feature).first()
     if not scenario:
         driver.quit()
         return  # Scenario should be generated first
@@ -319,65 +362,3 @@ def generate_test_case(web_application, feature):
     )
 
     driver.quit()
-
-
-def generate_test_scenarios_and_cases_excel(test_scenarios, test_cases):
-    # Create a new workbook and add sheets
-    wb = openpyxl.Workbook()
-    
-    # Add Test Scenarios sheet
-    ws_scenarios = wb.active
-    ws_scenarios.title = 'Test Scenarios'
-
-    # Add header
-    headers_scenarios = [
-        'Scenario ID', 'Feature Name', 'Description', 'Purpose', 'Web Application'
-    ]
-    ws_scenarios.append(headers_scenarios)
-
-    # Apply bold font to header row
-    for cell in ws_scenarios[1]:
-        cell.font = Font(size=12, bold=True)
-
-    # Add test scenarios data
-    for scenario in test_scenarios:
-        ws_scenarios.append([
-            scenario.scenario_id,
-            scenario.feature.name,
-            scenario.description,
-            scenario.purpose,
-            scenario.web_application.name
-        ])
-
-    # Add Test Cases sheet
-    ws_cases = wb.create_sheet(title='Test Cases')
-
-    # Add header
-    headers_cases = [
-        'Test Case ID', 'Scenario ID', 'Description', 'Pre-Conditions', 'Test Steps',
-        'Test Data', 'Expected Result', 'Post-Conditions', 'Priority', 'Test Environment', 'Tester Name', 'Date'
-    ]
-    ws_cases.append(headers_cases)
-
-    # Apply bold font to header row
-    for cell in ws_cases[1]:
-        cell.font = Font(size=12, bold=True)
-
-    # Add test cases data
-    for case in test_cases:
-        ws_cases.append([
-            case.test_case_id,
-            case.test_scenario.scenario_id,
-            case.description,
-            case.pre_conditions,
-            case.test_steps,
-            case.test_data,
-            case.expected_result,
-            case.post_conditions,
-            case.priority,
-            case.test_environment,
-            case.tester_name,
-            case.date
-        ])
-
-    return wb
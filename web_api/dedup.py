@@ -0,0 +1,109 @@
+import hashlib
+import re
+from urllib.parse import urljoin
+
+from .models import Component
+
+# Attributes that change between renders of the same component.
+VOLATILE_ATTRIBUTES = {'value', 'style', 'nonce', 'tabindex', 'autofocus', 'csrfmiddlewaretoken'}
+# Attributes holding URLs, resolved against the page URL before hashing.
+URL_ATTRIBUTES = {'href', 'action', 'formaction', 'src'}
+WHITESPACE = re.compile(r'\s+')
+
+
+def _normalize_text(text):
+    return WHITESPACE.sub(' ', text).strip().lower()
+
+
+def _node_label(element):
+    classes = element.get('class') or []
+    label = element.name
+    if element.get('id'):
+        label += f"#{element['id']}"
+    if classes:
+        label += '.' + '.'.join(sorted(classes))
+    return label
+
+
+def tag_path(element):
+    """
+    Returns the element's ancestry as 'body > nav.site-nav > a', without
+    sibling positions so the same component matches on differently laid out
+    pages.
+    """
+    labels = [_node_label(parent) for parent in element.parents if parent.name not in (None, '[document]', 'html')]
+    labels.reverse()
+    labels.append(_node_label(element))
+    return ' > '.join(labels)
+
+
+def _attributes(element, page_url=None):
+    pairs = []
+    for name, value in sorted(element.attrs.items()):
+        if name in VOLATILE_ATTRIBUTES or name.startswith('data-'):
+            continue
+        if isinstance(value, list):
+            value = ' '.join(sorted(value))
+        if name in URL_ATTRIBUTES and page_url:
+            value = urljoin(page_url, value.strip())
+        pairs.append(f"{name}={value}")
+    return '|'.join(pairs)
+
+
+def element_signature(kind, element, page_url=None):
+    """
+    Structural signature of a form, button or link parsed by BeautifulSoup:
+    a hash of its tag path, stable attributes and normalized text. Forms also
+    include the names of their inputs. URL attributes are resolved against
+    ``page_url`` so relative links compare by their target.
+    """
+    parts = [kind, tag_path(element), _attributes(element, page_url), _normalize_text(element.get_text(' '))]
+    if element.name == 'form':
+        parts.append(','.join(sorted(field.get('name', '') for field in element.find_all(['input', 'select', 'textarea']))))
+    return hashlib.sha1('\n'.join(parts).encode()).hexdigest()
+
+
+class ComponentDeduplicator:
+    """
+    Splits the elements found by a crawl into components that still need to be
+    interacted with and components already known, either earlier in the same
+    crawl or from a previous crawl of the same web application. Without a web
+    application only repeats within the crawl are recognised.
+    """
+
+    def __init__(self, web_application=None):
+        self.web_application = web_application
+        self.seen = set()
+
+    def split(self, kind, elements, page_url=None):
+        """
+        Returns ``(elements, signatures, shared)``: the elements still to be
+        analyzed with their signatures, and ready-made feature dicts that
+        reference existing components. Repeats within the crawl are dropped.
+        """
+        signed = []
+        for element in elements:
+            signature = element_signature(kind, element, page_url)
+            if signature not in self.seen:
+                self.seen.add(signature)
+                signed.append((element, signature))
+
+        known = {}
+        if self.web_application is not None:
+            components = Component.objects.filter(
+                web_application=self.web_application, signature__in=[signature for _, signature in signed]
+            )
+            known = {component.signature: component for component in components}
+        new = [(element, signature) for element, signature in signed if signature not in known]
+        elements = [element for element, _ in new]
+        signatures = [signature for _, signature in new]
+        shared = [
+            {
+                "description": known[signature].description,
+                "status": known[signature].status,
+                "signature": signature,
+                "shared": True,
+            }
+            for _, signature in signed if signature in known
+        ]
+        return elements, signatures, shared
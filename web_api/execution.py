@@ -0,0 +1,205 @@
+"""
+Browser side of the test case runner. This module runs inside the worker
+processes started by ``web_api.runner`` and deliberately does not touch
+Django, so it can be imported by spawned workers without configured settings.
+"""
+import re
+import time
+from multiprocessing.util import Finalize
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoAlertPresentException, TimeoutException, WebDriverException
+
+FORM = 'forms'
+BUTTON = 'buttons'
+LINK = 'links'
+
+# Patterns matching the test steps written by generate_test_case().
+TARGET_PATTERNS = {
+    FORM: re.compile(r"Fill out the form '(.*?)'"),
+    BUTTON: re.compile(r"Click the button '(.*?)'"),
+    LINK: re.compile(r"Click the link '(.*?)'"),
+}
+HREF_PATTERN = re.compile(r"Verify the navigation to '(.*?)'")
+
+# One browser per worker process, created by init_worker().
+_driver = None
+_options = {}
+
+
+def describe_job(test_case_id, feature_name, url, test_steps):
+    """
+    Builds the picklable job for one test case from its generated test steps.
+    """
+    kind = feature_name.lower()
+    target = TARGET_PATTERNS.get(kind)
+    target_match = target.search(test_steps) if target else None
+    href_match = HREF_PATTERN.search(test_steps)
+
+    return {
+        'id': test_case_id,
+        'kind': kind,
+        'url': url,
+        'target': target_match.group(1) if target_match else None,
+        'href': href_match.group(1) if href_match else None,
+    }
+
+
+def _start_driver():
+    global _driver
+    options = webdriver.ChromeOptions()
+    if _options.get('headless', True):
+        options.add_argument('--headless=new')
+    _driver = webdriver.Chrome(options=options)
+    _driver.set_page_load_timeout(_options.get('timeout', 10) * 3)
+
+
+def _quit_driver():
+    global _driver
+    if _driver is not None:
+        try:
+            _driver.quit()
+        except WebDriverException:
+            pass
+        _driver = None
+
+
+def init_worker(headless=True, timeout=10):
+    _options.update(headless=headless, timeout=timeout)
+    _start_driver()
+    # Worker processes leave through os._exit(), which skips atexit hooks.
+    Finalize(None, _quit_driver, exitpriority=10)
+
+
+def _xpath_literal(value):
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    parts = value.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in parts) + ")"
+
+
+def _find_form(driver, name):
+    if name and name != 'None':
+        forms = driver.find_elements(By.NAME, name)
+        forms = [form for form in forms if form.tag_name.lower() == 'form']
+        if forms:
+            return forms[0]
+    return driver.find_element(By.TAG_NAME, 'form')
+
+
+def _run_form(driver, job, timeout):
+    form = _find_form(driver, job['target'])
+    for input_element in form.find_elements(By.XPATH, ".//input[@name]"):
+        if input_element.get_attribute('type') in ('hidden', 'submit', 'button', 'checkbox', 'radio', 'file'):
+            continue
+        input_element.clear()
+        input_element.send_keys('test')  # Same placeholder data as analyze_forms()
+
+    start_url = driver.current_url
+    form.submit()
+    WebDriverWait(driver, timeout).until(EC.url_changes(start_url))
+    return True, f"Form submitted; navigated to '{driver.current_url}'."
+
+
+def _run_button(driver, job, timeout):
+    if job['target']:
+        button = driver.find_element(By.XPATH, f"//button[normalize-space()={_xpath_literal(job['target'])}]")
+    else:
+        button = driver.find_element(By.TAG_NAME, 'button')
+    button.click()
+
+    try:
+        WebDriverWait(driver, min(timeout, 2)).until(EC.alert_is_present())
+        driver.switch_to.alert.accept()
+        return True, f"Button '{job['target']}' clicked; alert handled."
+    except (NoAlertPresentException, TimeoutException):
+        return True, f"Button '{job['target']}' clicked without errors."
+
+
+def _run_link(driver, job, timeout):
+    # The generated steps hold the resolved href, which may differ from the
+    # attribute in the markup, so fall back to the link text.
+    links = driver.find_elements(By.XPATH, f"//a[@href={_xpath_literal(job['href'])}]") if job['href'] else []
+    if not links and job['target']:
+        links = driver.find_elements(By.LINK_TEXT, job['target'])
+    link = links[0] if links else driver.find_element(By.TAG_NAME, 'a')
+
+    start_url = driver.current_url
+    link.click()
+    WebDriverWait(driver, timeout).until(EC.url_changes(start_url))
+
+    current = driver.current_url
+    if job['href'] and current.rstrip('/') != job['href'].rstrip('/'):
+        return False, f"Navigated to '{current}' instead of '{job['href']}'."
+    return True, f"Navigated to '{current}'."
+
+
+INTERACTIONS = {
+    FORM: _run_form,
+    BUTTON: _run_button,
+    LINK: _run_link,
+}
+
+
+def execute_job(job, timeout):
+    """
+    Runs one case in the worker's browser. Returns (passed, actual_result).
+    """
+    interaction = INTERACTIONS.get(job['kind'])
+    if interaction is None:
+        return False, f"No runner for feature type '{job['kind']}'."
+
+    if _driver is None:
+        # The previous browser died; start its replacement here so that a
+        # failure to do so is reported against this case.
+        try:
+            _start_driver()
+        except WebDriverException as e:
+            raise WebDriverException(f"Browser could not be started: {e.msg or type(e).__name__}") from e
+    _driver.get(job['url'])
+    return interaction(_driver, job, timeout)
+
+
+def run_shard(jobs, retries=0, fail_fast=False):
+    """
+    Executes a shard of jobs sequentially in this worker's browser and returns
+    one result dict per executed job. A failing case is retried up to
+    ``retries`` times; with ``fail_fast`` the shard stops at the first failure.
+    """
+    timeout = _options.get('timeout', 10)
+    results = []
+
+    for job in jobs:
+        started = time.monotonic()
+        for attempt in range(retries + 1):
+            try:
+                passed, actual_result = execute_job(job, timeout)
+            except TimeoutException:
+                passed, actual_result = False, "Timed out waiting for the expected navigation."
+            except WebDriverException as e:
+                passed, actual_result = False, f"error: {e.msg or type(e).__name__}"
+                # A dead session fails every later case, so drop it and let
+                # execute_job() start a new browser.
+                try:
+                    if _driver is not None:
+                        _driver.current_url
+                except WebDriverException:
+                    _quit_driver()
+            if passed:
+                break
+
+        results.append({
+            'id': job['id'],
+            'status': 'Pass' if passed else 'Fail',
+            'actual_result': actual_result if attempt == 0 else f"{actual_result} (attempts: {attempt + 1})",
+            'execution_time': time.monotonic() - started,
+        })
+        if fail_fast and not passed:
+            break
+
+    return results
@@ -0,0 +1,323 @@
+import codecs
+import csv
+import io
+from zipfile import BadZipFile
+
+import openpyxl
+from django.db import transaction
+from openpyxl.utils.exceptions import InvalidFileException
+
+from .models import TestScenario, TestCase
+
+# Header -> model field, in the layout written by generate_test_scenarios_and_cases_excel().
+SCENARIO_COLUMNS = {
+    'Description': 'description',
+    'Purpose': 'purpose',
+}
+TEST_CASE_COLUMNS = {
+    'Description': 'description',
+    'Pre-Conditions': 'pre_conditions',
+    'Test Steps': 'test_steps',
+    'Test Data': 'test_data',
+    'Expected Result': 'expected_result',
+    'Post-Conditions': 'post_conditions',
+    'Actual Result': 'actual_result',
+    'Status': 'status',
+    'Priority': 'priority',
+    'Test Environment': 'test_environment',
+    'Tester Name': 'tester_name',
+}
+NULLABLE_FIELDS = {'test_data', 'post_conditions', 'actual_result', 'status'}
+CHOICES = {
+    'status': {'pass': 'Pass', 'fail': 'Fail'},
+    'priority': {'low': 'Low', 'medium': 'Medium', 'high': 'High'},
+}
+
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportFileError(Exception):
+    pass
+
+
+class ImportReport:
+    """
+    Counts and per-row errors for one import. Only the first
+    ``MAX_REPORTED_ERRORS`` errors are kept so the report stays small.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors = []
+
+    def error(self, sheet, row, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"sheet": sheet, "row": row, "error": message})
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+def _clean(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def _convert(field, value, max_length=None):
+    value = _clean(value)
+    if field in CHOICES:
+        if not value and field in NULLABLE_FIELDS:
+            return None
+        try:
+            return CHOICES[field][value.lower()]
+        except KeyError:
+            raise ValueError(f"Invalid {field} '{value}'; expected one of {', '.join(CHOICES[field].values())}.")
+    if not value and field in NULLABLE_FIELDS:
+        return None
+    if max_length is not None and len(value) > max_length:
+        raise ValueError(f"Invalid {field}; {len(value)} characters is longer than the limit of {max_length}.")
+    return value
+
+
+def _max_length(model, field):
+    return model._meta.get_field(field).max_length
+
+
+def iter_xlsx_sheets(file):
+    """
+    Yields (sheet title, header, row iterator) for each worksheet, reading the
+    workbook in openpyxl's streaming read-only mode.
+    """
+    errors = (BadZipFile, InvalidFileException, KeyError, OSError, ValueError)
+    try:
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    except errors as e:
+        raise ImportFileError(f"Could not read the workbook: {e}")
+    try:
+        for worksheet in workbook.worksheets:
+            rows = _guard(worksheet.iter_rows(values_only=True), errors, "Could not read the workbook")
+            header = next(rows, None)
+            if header is not None:
+                yield worksheet.title, [_clean(column) for column in header], rows
+    finally:
+        workbook.close()
+
+
+def _guard(rows, errors, message):
+    # Turns read errors past the header into ImportFileError as well.
+    try:
+        yield from rows
+    except errors as e:
+        raise ImportFileError(f"{message}: {e}")
+
+
+def _check_encoding(file, chunk_size=1 << 20):
+    """
+    Decodes the whole upload once before anything is written, so a file that
+    is not UTF-8 is rejected up front rather than after some batches.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    position = 0
+    try:
+        while chunk := file.read(chunk_size):
+            decoder.decode(chunk)
+            position += len(chunk)
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError as e:
+        raise ImportFileError(f"CSV files must be UTF-8 encoded; invalid byte at offset {position + e.start}.")
+    file.seek(0)
+
+
+def iter_csv_sheets(file, name='CSV'):
+    if isinstance(file, io.TextIOBase):
+        text = file
+    else:
+        _check_encoding(file)
+        text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    rows = _guard(csv.reader(text), (csv.Error, UnicodeDecodeError), "Could not read the CSV file")
+    header = next(rows, None)
+    if header is not None:
+        yield name, [_clean(column) for column in header], rows
+
+
+class TestCaseImporter:
+    """
+    Upserts scenarios and test cases from spreadsheets in the export layout.
+
+    Rows are matched on ``Scenario ID`` (and ``Test Case ID`` for cases) using
+    id maps loaded once up front, and written with update_by_pk/bulk_create in
+    one transaction per ``batch_size`` rows. Existing scenarios are only
+    updated; test cases are created when their scenario exists. Only the
+    columns present in the sheet are written.
+    """
+
+    def __init__(self, batch_size=2000):
+        self.batch_size = batch_size
+        self.report = ImportReport()
+        self._scenario_ids = None
+        self._test_case_ids = None
+
+    @property
+    def scenario_ids(self):
+        if self._scenario_ids is None:
+            self._scenario_ids = dict(TestScenario.objects.values_list('scenario_id', 'id').iterator(chunk_size=5000))
+        return self._scenario_ids
+
+    @property
+    def test_case_ids(self):
+        if self._test_case_ids is None:
+            rows = TestCase.objects.values_list('test_scenario__scenario_id', 'test_case_id', 'id')
+            self._test_case_ids = {
+                (scenario_id, test_case_id): pk for scenario_id, test_case_id, pk in rows.iterator(chunk_size=5000)
+            }
+        return self._test_case_ids
+
+    def import_file(self, file, filename):
+        name = filename.lower()
+        if name.endswith(('.xlsx', '.xlsm')):
+            sheets = iter_xlsx_sheets(file)
+        elif name.endswith('.csv'):
+            sheets = iter_csv_sheets(file, name=filename)
+        else:
+            raise ImportFileError("Unsupported file type; upload an .xlsx or .csv file.")
+
+        for sheet, header, rows in sheets:
+            if 'Test Case ID' in header:
+                self.import_test_cases(sheet, header, rows)
+            elif 'Scenario ID' in header:
+                self.import_scenarios(sheet, header, rows)
+            else:
+                self.report.error(sheet, 1, "Sheet has neither a 'Test Case ID' nor a 'Scenario ID' column.")
+        return self.report
+
+    def _columns(self, header, mapping, model):
+        return [
+            (index, mapping[column], _max_length(model, mapping[column]))
+            for index, column in enumerate(header) if column in mapping
+        ]
+
+    def _read(self, row, columns):
+        values = {}
+        for index, field, max_length in columns:
+            values[field] = _convert(field, row[index] if index < len(row) else None, max_length)
+        return values
+
+    def import_scenarios(self, sheet, header, rows):
+        key_index = header.index('Scenario ID')
+        columns = self._columns(header, SCENARIO_COLUMNS, TestScenario)
+        fields = [field for _, field, _ in columns]
+        updates = []
+
+        for row_number, row in enumerate(rows, start=2):
+            if not any(row):
+                continue
+            self.report.rows += 1
+            scenario_id = _clean(row[key_index]) if key_index < len(row) else ''
+            pk = self.scenario_ids.get(scenario_id)
+            if pk is None:
+                self.report.error(sheet, row_number, f"Unknown scenario '{scenario_id}'.")
+                continue
+            try:
+                values = self._read(row, columns)
+            except ValueError as e:
+                self.report.error(sheet, row_number, str(e))
+                continue
+
+            updates.append(TestScenario(id=pk, **values))
+            if len(updates) >= self.batch_size:
+                self._flush(TestScenario, updates, {}, fields)
+                updates = []
+
+        self._flush(TestScenario, updates, {}, fields)
+
+    def import_test_cases(self, sheet, header, rows):
+        if 'Scenario ID' not in header:
+            self.report.error(sheet, 1, "Test case sheet has no 'Scenario ID' column.")
+            return
+
+        case_index = header.index('Test Case ID')
+        scenario_index = header.index('Scenario ID')
+        columns = self._columns(header, TEST_CASE_COLUMNS, TestCase)
+        fields = [field for _, field, _ in columns]
+        id_length = _max_length(TestCase, 'test_case_id')
+        updates, creates = [], {}
+
+        for row_number, row in enumerate(rows, start=2):
+            if not any(row):
+                continue
+            self.report.rows += 1
+            test_case_id = _clean(row[case_index]) if case_index < len(row) else ''
+            scenario_id = _clean(row[scenario_index]) if scenario_index < len(row) else ''
+            if not test_case_id:
+                self.report.error(sheet, row_number, "Missing Test Case ID.")
+                continue
+            if len(test_case_id) > id_length:
+                self.report.error(sheet, row_number, f"Test Case ID is longer than {id_length} characters.")
+                continue
+            if scenario_id not in self.scenario_ids:
+                self.report.error(sheet, row_number, f"Unknown scenario '{scenario_id}'.")
+                continue
+            try:
+                values = self._read(row, columns)
+            except ValueError as e:
+                self.report.error(sheet, row_number, str(e))
+                continue
+
+            key = (scenario_id, test_case_id)
+            pk = self.test_case_ids.get(key)
+            if pk is not None:
+                updates.append(TestCase(id=pk, **values))
+            elif key in creates:
+                # Repeated row for a case that is not written yet.
+                for field, value in values.items():
+                    setattr(creates[key], field, value)
+            elif not values.get('priority'):
+                self.report.error(sheet, row_number, "New test cases need a Priority.")
+                continue
+            else:
+                new_case = TestCase(
+                    test_scenario_id=self.scenario_ids[scenario_id],
+                    test_case_id=test_case_id,
+                    **{field: '' for field in TEST_CASE_COLUMNS.values() if field not in NULLABLE_FIELDS},
+                )
+                for field, value in values.items():
+                    setattr(new_case, field, value)
+                creates[key] = new_case
+
+            if len(updates) + len(creates) >= self.batch_size:
+                self._flush(TestCase, updates, creates, fields)
+                updates, creates = [], {}
+
+        self._flush(TestCase, updates, creates, fields)
+
+    def _flush(self, model, updates, creates, fields):
+        if not updates and not creates:
+            return
+        updated = 0
+        with transaction.atomic():
+            if updates and fields:
+                updated = model.objects.update_by_pk(updates, fields, batch_size=500)
+            if creates:
+                model.objects.bulk_create(list(creates.values()), batch_size=500)
+        self.report.updated += updated
+        self.report.created += len(creates)
+        for key, test_case in creates.items():
+            self.test_case_ids[key] = test_case.pk
+
+
+def import_test_cases(file, filename, batch_size=2000):
+    """
+    Imports an edited export from ``file`` and returns the report dict.
+    """
+    return TestCaseImporter(batch_size=batch_size).import_file(file, filename).as_dict()
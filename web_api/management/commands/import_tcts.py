@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from web_api.importer import ImportFileError, import_test_cases
+
+
+class Command(BaseCommand):
+    help = "Imports test scenarios and test cases from an edited .xlsx or .csv export."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows written per transaction.")
+        parser.add_argument('--report', help="Write the full JSON report to this file.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            with open(path, 'rb') as file:
+                report = import_test_cases(file, path, batch_size=options['batch_size'])
+        except OSError as e:
+            raise CommandError(str(e))
+        except ImportFileError as e:
+            raise CommandError(str(e))
+
+        if options['report']:
+            with open(options['report'], 'w') as output:
+                json.dump(report, output, indent=2)
+
+        for error in report['errors'][:20]:
+            self.stderr.write(f"{error['sheet']} row {error['row']}: {error['error']}")
+        self.stdout.write(
+            f"Read {report['rows']} rows: {report['created']} created, {report['updated']} updated, "
+            f"{report['error_count']} errors."
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from web_api.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index over test cases and test scenarios."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows written per batch.")
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        with transaction.atomic():
+            indexed = backend.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} documents with {type(backend).__name__}."))
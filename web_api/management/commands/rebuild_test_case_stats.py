@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from web_api.models import TestCase
+from web_api.stats import count_by_dimension, stored_counts, rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the per-application test case statistics from the TestCase table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only compare the stored statistics with a fresh count and report mismatches."
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            expected = count_by_dimension(TestCase.objects.all())
+            stored = stored_counts()
+            mismatches = sorted(
+                (key, stored.get(key, 0), expected.get(key, 0))
+                for key in set(expected) | set(stored)
+                if stored.get(key, 0) != expected.get(key, 0)
+            )
+            for (web_application_id, dimension, value), found, wanted in mismatches:
+                self.stdout.write(
+                    f"web application {web_application_id} {dimension}={value!r}: stored {found}, expected {wanted}"
+                )
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} statistics are out of date; run without --check to rebuild.")
+            self.stdout.write(self.style.SUCCESS("Test case statistics are consistent."))
+            return
+
+        with transaction.atomic():
+            counts = rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(counts)} test case statistics."))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from web_api.crawl import STALE_AFTER_SECONDS, claim, resumable_jobs, run_crawl
+
+
+class Command(BaseCommand):
+    help = "Resumes interrupted crawls from their last checkpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_ids', nargs='*', type=int, help="Crawl jobs to resume (default: all unfinished).")
+        parser.add_argument('--checkpoint-every', type=int, default=25, help="Elements analyzed between checkpoints.")
+        parser.add_argument(
+            '--stale-after', type=int, default=STALE_AFTER_SECONDS,
+            help="Seconds without progress after which a running crawl is considered dead and resumed.",
+        )
+
+    def handle(self, *args, **options):
+        jobs = resumable_jobs(options['stale_after']).order_by('id')
+        if options['job_ids']:
+            jobs = jobs.filter(id__in=options['job_ids'])
+            missing = set(options['job_ids']) - set(jobs.values_list('id', flat=True))
+            if missing:
+                raise CommandError(
+                    f"No resumable crawl jobs with ids: {', '.join(map(str, sorted(missing)))} "
+                    "(completed, or still running in another process)"
+                )
+
+        failures = 0
+        for job_id in list(jobs.values_list('id', flat=True)):
+            job = claim(job_id, options['stale_after'])
+            if job is None:
+                self.stdout.write(f"Crawl {job_id} was picked up by another process; skipping.")
+                continue
+
+            self.stdout.write(f"Resuming crawl {job.id} of {job.url} at {job.processed}/{job.total} elements.")
+            try:
+                run_crawl(job, checkpoint_every=options['checkpoint_every'])
+            except Exception as e:
+                failures += 1
+                self.stderr.write(f"Crawl {job.id} failed again: {e}")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"Crawl {job.id} completed."))
+
+        if failures:
+            raise CommandError(f"{failures} crawls did not complete.")
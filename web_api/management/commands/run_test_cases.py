@@ -0,0 +1,48 @@
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand, CommandError
+
+from web_api.models import WebApplication
+from web_api.runner import run_test_cases
+
+
+class Command(BaseCommand):
+    help = "Executes the generated test cases of a web application and records actual_result and status."
+
+    def add_arguments(self, parser):
+        parser.add_argument('web_app_id', type=int)
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Number of browser worker processes (default: CPU count).")
+        parser.add_argument('--retries', type=int, default=0, help="Extra attempts for a failing case.")
+        parser.add_argument('--fail-fast', action='store_true', help="Stop scheduling cases after the first failure.")
+        parser.add_argument('--shard-size', type=int, default=25, help="Cases handed to a worker at a time.")
+        parser.add_argument('--batch-size', type=int, default=500, help="Results written per database update.")
+        parser.add_argument('--timeout', type=int, default=10, help="Seconds to wait for each interaction.")
+        parser.add_argument('--no-headless', action='store_true', help="Show the browser windows.")
+
+    def handle(self, *args, **options):
+        try:
+            web_application = WebApplication.objects.get(id=options['web_app_id'])
+        except WebApplication.DoesNotExist:
+            raise CommandError("Web application not found.")
+
+        try:
+            summary = run_test_cases(
+                web_application,
+                workers=options['workers'],
+                retries=options['retries'],
+                fail_fast=options['fail_fast'],
+                shard_size=options['shard_size'],
+                batch_size=options['batch_size'],
+                headless=not options['no_headless'],
+                timeout=options['timeout'],
+            )
+        except BrokenProcessPool:
+            raise CommandError("A browser worker died; check that Chrome and chromedriver are available.")
+
+        self.stdout.write(
+            f"Executed {summary['executed']} of {summary['total']} test cases: "
+            f"{summary['passed']} passed, {summary['failed']} failed."
+        )
+        if summary['stopped_early']:
+            self.stdout.write(self.style.WARNING("Stopped early because of --fail-fast."))
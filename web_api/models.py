@@ -1,4 +1,6 @@
-from django.db import models
+from contextlib import contextmanager
+
+from django.db import connections, models, router, transaction
 
 # Create your models here.
 
@@ -12,8 +14,34 @@ class WebApplication(models.Model):
         return self.name
 
 
+class Component(models.Model):
+    """
+    An interactive element of a web application recognised by its structural
+    signature (see ``web_api.dedup``), such as a header link or cookie banner
+    button that repeats across its pages. Test scenarios and cases are
+    generated for the first feature that references it. Components are never
+    shared between applications, so every application is tested in full.
+    """
+    web_application = models.ForeignKey(WebApplication, on_delete=models.CASCADE, related_name='components')
+    signature = models.CharField(max_length=40)
+    kind = models.CharField(max_length=20)
+    description = models.TextField()
+    status = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['web_application', 'signature'], name='unique_component_signature'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.signature[:12]}"
+
+
 class Feature(models.Model):
     web_application = models.ForeignKey(WebApplication, on_delete=models.CASCADE)
+    component = models.ForeignKey(Component, on_delete=models.SET_NULL, related_name='features', blank=True, null=True)
+    idempotency_key = models.CharField(max_length=100, unique=True, blank=True, null=True)
     name = models.CharField(max_length=255)
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
@@ -22,6 +50,171 @@ class Feature(models.Model):
         return self.name
 
 
+class CrawlJob(models.Model):
+    """
+    Checkpointed state of a crawl so that it can resume after a crash. The
+    frontier lists the elements still to analyze and ``results`` holds the
+    features analyzed but not yet stored, by type; both are saved
+    periodically by ``web_api.crawl.run_crawl``.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    web_application = models.ForeignKey(WebApplication, on_delete=models.CASCADE, related_name='crawl_jobs')
+    url = models.URLField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    frontier = models.JSONField(default=list, blank=True)
+    results = models.JSONField(default=dict, blank=True)
+    total = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Crawl {self.id} of {self.url} ({self.status})"
+
+
+class TrackedQuerySet(models.QuerySet):
+    """
+    Base for querysets whose bulk write paths must keep derived data in step,
+    since model signals (see ``web_api.signals``) do not fire for them.
+    Subclasses name the fields they care about and wrap writes in
+    ``track_changes``. Django's bulk_update() goes through ``update`` and is
+    tracked with it; ``delete`` lets ``before_delete`` account for the whole
+    queryset at once instead of one delete signal per row.
+    """
+
+    def tracked_fields(self):
+        return frozenset()
+
+    @contextmanager
+    def track_changes(self, pks, fields):
+        yield
+
+    def after_create(self, objs):
+        pass
+
+    def before_delete(self):
+        pass
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            self.before_delete()
+            return super().delete()
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            self.after_create([obj for obj in created if obj.pk is not None])
+        return created
+
+    def update(self, **kwargs):
+        if not self.tracked_fields().intersection(kwargs):
+            return super().update(**kwargs)
+
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list('pk', flat=True))
+            with self.track_changes(pks, kwargs):
+                return super().update(**kwargs)
+
+    def update_by_pk(self, objs, fields, batch_size=None):
+        """
+        bulk_update() for plain values that runs one parameterised UPDATE by
+        primary key per object through executemany(). Django's bulk_update
+        builds a CASE/WHEN per field whose cost grows with the batch, which
+        dominates large imports. Returns the number of rows matched.
+        """
+        if not fields:
+            raise ValueError("Field names must be given to update_by_pk().")
+        meta = self.model._meta
+        model_fields = [meta.get_field(name) for name in fields]
+        if any(not field.concrete or field.many_to_many for field in model_fields):
+            raise ValueError("update_by_pk() can only be used with concrete fields.")
+        if any(field.primary_key for field in model_fields):
+            raise ValueError("update_by_pk() cannot be used with primary key fields.")
+        objs = list(objs)
+        if not objs:
+            return 0
+        for obj in objs:
+            if obj.pk is None:
+                raise ValueError("All update_by_pk() objects must have a primary key set.")
+            if any(hasattr(getattr(obj, field.attname), 'resolve_expression') for field in model_fields):
+                raise ValueError("update_by_pk() only writes plain values; use bulk_update() for expressions.")
+
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        assignments = ', '.join(f"{quote(field.column)} = %s" for field in model_fields)
+        sql = f"UPDATE {quote(meta.db_table)} SET {assignments} WHERE {quote(meta.pk.column)} = %s"
+        params = [
+            [field.get_db_prep_save(getattr(obj, field.attname), connection=connection) for field in model_fields]
+            + [obj.pk]
+            for obj in objs
+        ]
+        batch_size = batch_size or len(params)
+
+        updated = 0
+        with transaction.atomic(using=self.db):
+            tracked = self.tracked_fields().intersection(fields)
+            with self.track_changes([obj.pk for obj in objs] if tracked else [], tracked):
+                with connection.cursor() as cursor:
+                    for start in range(0, len(params), batch_size):
+                        cursor.executemany(sql, params[start:start + batch_size])
+                        updated += cursor.rowcount
+        return updated
+
+
+class TestScenarioQuerySet(TrackedQuerySet):
+    """
+    Keeps ``TestCaseStat`` and the search index in step with bulk writes to
+    scenarios.
+    """
+
+    def tracked_fields(self):
+        from .stats import SCENARIO_TRACKED_FIELDS
+        from .search import TEST_SCENARIO_INDEXED_FIELDS
+        return SCENARIO_TRACKED_FIELDS | TEST_SCENARIO_INDEXED_FIELDS
+
+    @contextmanager
+    def track_changes(self, pks, fields):
+        from .stats import SCENARIO_TRACKED_FIELDS, count_by_dimension_for, apply_deltas
+        from .search import TEST_SCENARIO_INDEXED_FIELDS, get_search_backend, test_case_pks_for_scenarios
+
+        # Moving a scenario to another application moves all of its cases.
+        track_stats = pks and SCENARIO_TRACKED_FIELDS.intersection(fields)
+        if track_stats:
+            before = count_by_dimension_for(pks, field='test_scenario_id')
+        yield
+        if track_stats:
+            after = count_by_dimension_for(pks, field='test_scenario_id')
+            after.subtract(before)
+            apply_deltas(after)
+        if pks and TEST_SCENARIO_INDEXED_FIELDS.intersection(fields):
+            get_search_backend().index_test_scenarios(pks)
+        if pks and SCENARIO_TRACKED_FIELDS.intersection(fields):
+            # Test case documents carry their scenario's web application.
+            get_search_backend().index_test_cases(test_case_pks_for_scenarios(pks))
+
+    def after_create(self, objs):
+        from .search import get_search_backend
+        get_search_backend().index_test_scenarios([obj.pk for obj in objs])
+
+    def before_delete(self):
+        from .stats import count_by_dimension_for, apply_deltas
+        from .search import get_search_backend, test_case_pks_for_scenarios
+
+        # Test cases go with their scenarios; see TestCase.delete().
+        pks = list(self.values_list('pk', flat=True))
+        counts = count_by_dimension_for(pks, field='test_scenario_id')
+        apply_deltas({key: -count for key, count in counts.items()})
+        get_search_backend().remove_test_cases(test_case_pks_for_scenarios(pks))
+        get_search_backend().remove_test_scenarios(pks)
+
+
 class TestScenario(models.Model):
     web_application = models.ForeignKey(WebApplication, on_delete=models.CASCADE, related_name='test_scenarios')
     feature = models.ForeignKey(Feature, on_delete=models.CASCADE, related_name='test_scenarios')
@@ -30,10 +223,56 @@ class TestScenario(models.Model):
     purpose = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = TestScenarioQuerySet.as_manager()
+
     def __str__(self):
         return self.scenario_id
 
 
+class TestCaseQuerySet(TrackedQuerySet):
+    """
+    Keeps ``TestCaseStat`` and the search index in step with bulk writes to
+    test cases.
+    """
+
+    def tracked_fields(self):
+        from .stats import TRACKED_FIELDS
+        from .search import TEST_CASE_INDEXED_FIELDS
+        return TRACKED_FIELDS | TEST_CASE_INDEXED_FIELDS
+
+    @contextmanager
+    def track_changes(self, pks, fields):
+        from .stats import TRACKED_FIELDS, count_by_dimension_for, apply_deltas
+        from .search import TEST_CASE_INDEXED_FIELDS, get_search_backend
+
+        track_stats = pks and TRACKED_FIELDS.intersection(fields)
+        if track_stats:
+            before = count_by_dimension_for(pks)
+        yield
+        if track_stats:
+            after = count_by_dimension_for(pks)
+            after.subtract(before)
+            apply_deltas(after)
+        if pks and TEST_CASE_INDEXED_FIELDS.intersection(fields):
+            get_search_backend().index_test_cases(pks)
+
+    def after_create(self, objs):
+        from .stats import deltas_for_new_cases, apply_deltas
+        from .search import get_search_backend
+
+        apply_deltas(deltas_for_new_cases(objs))
+        get_search_backend().index_test_cases([obj.pk for obj in objs])
+
+    def before_delete(self):
+        from .stats import count_by_dimension, apply_deltas
+        from .search import get_search_backend
+
+        pks = list(self.values_list('pk', flat=True))
+        counts = count_by_dimension(self)
+        apply_deltas({key: -count for key, count in counts.items()})
+        get_search_backend().remove_test_cases(pks)
+
+
 class TestCase(models.Model):
     test_scenario = models.ForeignKey(TestScenario, on_delete=models.CASCADE, related_name='test_cases')
     test_case_id = models.CharField(max_length=100)
@@ -45,11 +284,48 @@ class TestCase(models.Model):
     post_conditions = models.TextField(blank=True, null=True)
     actual_result = models.TextField(blank=True, null=True)
     status = models.CharField(max_length=20, choices=[('Pass', 'Pass'), ('Fail', 'Fail')], blank=True, null=True)
+    execution_time = models.FloatField(blank=True, null=True, help_text="Seconds taken by the last run, retries included.")
+    executed_at = models.DateTimeField(blank=True, null=True)
     priority = models.CharField(max_length=20, choices=[('Low', 'Low'), ('Medium', 'Medium'), ('High', 'High')])
     test_environment = models.CharField(max_length=100)
     test_case_type = models.CharField(max_length=50)
     tester_name = models.CharField(max_length=100)
     date = models.DateField(auto_now_add=True)
 
+    objects = TestCaseQuerySet.as_manager()
+
     def __str__(self):
         return self.test_case_id
+
+    def delete(self, using=None, keep_parents=False):
+        # TestCase has no delete signal receivers, so that cascades from
+        # scenarios and applications delete its rows in one statement; single
+        # deletes go through TestCaseQuerySet.delete() to update stats.
+        if self.pk is None:
+            raise ValueError(
+                f"{self._meta.object_name} object can't be deleted because its id attribute is set to None."
+            )
+        using = using or router.db_for_write(self.__class__, instance=self)
+        deleted = type(self).objects.using(using).filter(pk=self.pk).delete()
+        self.pk = None
+        return deleted
+
+
+class TestCaseStat(models.Model):
+    """
+    Running count of test cases per web application for one value of one
+    dimension (``status``, ``priority`` or ``test_case_type``). The ``total``
+    dimension holds the overall count under an empty value.
+    """
+    web_application = models.ForeignKey(WebApplication, on_delete=models.CASCADE, related_name='test_case_stats')
+    dimension = models.CharField(max_length=20)
+    value = models.CharField(max_length=50, blank=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['web_application', 'dimension', 'value'], name='unique_test_case_stat'),
+        ]
+
+    def __str__(self):
+        return f"{self.web_application_id} {self.dimension}={self.value!r}: {self.count}"
@@ -0,0 +1,128 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import TestCase
+from .execution import describe_job, init_worker, run_shard
+
+RESULT_FIELDS = ['actual_result', 'status', 'execution_time', 'executed_at']
+
+
+def build_jobs(web_application):
+    """
+    Returns one picklable job per generated test case of the web application.
+    """
+    rows = (
+        TestCase.objects
+        .filter(test_scenario__web_application=web_application)
+        .order_by('id')
+        .values_list('id', 'test_scenario__feature__name', 'test_steps')
+    )
+    return [
+        describe_job(pk, feature_name, web_application.url, test_steps)
+        for pk, feature_name, test_steps in rows.iterator(chunk_size=2000)
+    ]
+
+
+def shard(jobs, size):
+    return [jobs[i:i + size] for i in range(0, len(jobs), size)]
+
+
+def save_results(results, batch_size=1000):
+    """
+    Writes runner results back to their TestCase rows in batched updates.
+    """
+    executed_at = timezone.now()
+    test_cases = [
+        TestCase(
+            id=result['id'],
+            actual_result=result['actual_result'],
+            status=result['status'],
+            execution_time=result['execution_time'],
+            executed_at=executed_at,
+        )
+        for result in results
+    ]
+    with transaction.atomic():
+        TestCase.objects.update_by_pk(test_cases, RESULT_FIELDS, batch_size=batch_size)
+
+
+def shard_results(future, jobs):
+    """
+    Returns the results of a finished shard. A shard that raised, for example
+    because its browser could not be restarted, fails all of its cases
+    instead of aborting the run. A broken pool still propagates.
+    """
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        raise
+    except Exception as e:
+        return [
+            {
+                'id': job['id'],
+                'status': 'Fail',
+                'actual_result': f"error: worker failed: {str(e) or type(e).__name__}",
+                'execution_time': None,
+            }
+            for job in jobs
+        ]
+
+
+def run_test_cases(web_application, workers=None, retries=0, fail_fast=False, shard_size=25,
+                   batch_size=500, headless=True, timeout=10):
+    """
+    Executes every test case of a web application in a pool of worker
+    processes, each driving its own browser, and stores the outcome on the
+    cases. Results are flushed every ``batch_size`` cases and whenever the run
+    ends, so an interrupted run keeps what it finished. Returns a summary dict.
+    """
+    jobs = build_jobs(web_application)
+    summary = {'total': len(jobs), 'executed': 0, 'passed': 0, 'failed': 0, 'stopped_early': False}
+    if not jobs:
+        return summary
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    pending_results = []
+
+    def record(results):
+        nonlocal pending_results
+        pending_results.extend(results)
+        failed = sum(1 for result in results if result['status'] == 'Fail')
+        summary['executed'] += len(results)
+        summary['failed'] += failed
+        summary['passed'] += len(results) - failed
+        if len(pending_results) >= batch_size:
+            save_results(pending_results, batch_size)
+            pending_results = []
+        return failed
+
+    # Workers must not inherit open database connections from this process.
+    connections.close_all()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(headless, timeout)) as executor:
+            futures = {
+                executor.submit(run_shard, jobs_shard, retries, fail_fast): jobs_shard
+                for jobs_shard in shard(jobs, shard_size)
+            }
+
+            done = set()
+            for future in as_completed(futures):
+                done.add(future)
+                if record(shard_results(future, futures[future])) and fail_fast:
+                    summary['stopped_early'] = True
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    # Shards that were already running still report their results.
+                    for other, jobs_shard in futures.items():
+                        if other not in done and not other.cancelled():
+                            record(shard_results(other, jobs_shard))
+                    break
+    finally:
+        if pending_results:
+            save_results(pending_results, batch_size)
+    return summary
@@ -0,0 +1,324 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import TestScenario, TestCase
+
+TEST_CASE = 'test_case'
+TEST_SCENARIO = 'test_scenario'
+
+# Columns that feed the index; writes touching them require a reindex.
+TEST_CASE_FIELDS = ('description', 'test_steps', 'expected_result')
+TEST_SCENARIO_FIELDS = ('description', 'purpose')
+TEST_CASE_INDEXED_FIELDS = frozenset(TEST_CASE_FIELDS + ('test_scenario', 'test_scenario_id'))
+TEST_SCENARIO_INDEXED_FIELDS = frozenset(TEST_SCENARIO_FIELDS + ('web_application', 'web_application_id'))
+
+
+def test_case_documents(test_cases):
+    """
+    Yields (id, web_application_id, description, details) for a TestCase queryset.
+    """
+    rows = test_cases.values_list(
+        'id', 'test_scenario__web_application_id', *TEST_CASE_FIELDS
+    )
+    for pk, web_application_id, description, test_steps, expected_result in rows.iterator(chunk_size=2000):
+        yield pk, web_application_id, description, f"{test_steps}\n{expected_result}"
+
+
+def test_case_pks_for_scenarios(scenario_pks, chunk_size=5000):
+    pks = []
+    for start in range(0, len(scenario_pks), chunk_size):
+        test_cases = TestCase.objects.filter(test_scenario_id__in=scenario_pks[start:start + chunk_size])
+        pks.extend(test_cases.values_list('pk', flat=True))
+    return pks
+
+
+def test_scenario_documents(test_scenarios):
+    rows = test_scenarios.values_list('id', 'web_application_id', *TEST_SCENARIO_FIELDS)
+    yield from rows.iterator(chunk_size=2000)
+
+
+class BaseSearchBackend:
+    """
+    Interface for search backends. ``search`` returns ``(count, hits)`` where
+    each hit is a dict with ``type``, ``id``, ``web_application_id``,
+    ``score`` and ``snippet``. ``count`` is exact up to ``count_limit``
+    matches; backends may stop counting there, return ``count_limit + 1`` and
+    only page through ``count_limit`` hits. Such backends rank broad queries
+    within their ``count_limit`` most recent matches, so an older, better
+    match is not returned on any page; they set ``ranking_capped``.
+    """
+    count_limit = 1000
+    ranking_capped = False
+
+    def setup(self):
+        pass
+
+    def index_test_cases(self, pks):
+        raise NotImplementedError
+
+    def index_test_scenarios(self, pks):
+        raise NotImplementedError
+
+    def remove_test_cases(self, pks):
+        raise NotImplementedError
+
+    def remove_test_scenarios(self, pks):
+        raise NotImplementedError
+
+    def remove_web_application(self, web_application_id):
+        raise NotImplementedError
+
+    def search(self, query, web_application_id=None, kind=None, offset=0, limit=20):
+        raise NotImplementedError
+
+    def rebuild(self, batch_size=2000):
+        raise NotImplementedError
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """
+    Unindexed fallback using ``icontains`` lookups, for databases without a
+    full-text backend configured. Index maintenance is a no-op.
+    """
+
+    def index_test_cases(self, pks):
+        pass
+
+    def index_test_scenarios(self, pks):
+        pass
+
+    def remove_test_cases(self, pks):
+        pass
+
+    def remove_test_scenarios(self, pks):
+        pass
+
+    def remove_web_application(self, web_application_id):
+        pass
+
+    def rebuild(self, batch_size=2000):
+        return 0
+
+    def _filter(self, queryset, fields, query):
+        for term in query.split():
+            term_filter = Q()
+            for field in fields:
+                term_filter |= Q(**{f'{field}__icontains': term})
+            queryset = queryset.filter(term_filter)
+        return queryset
+
+    def search(self, query, web_application_id=None, kind=None, offset=0, limit=20):
+        cases = self._filter(TestCase.objects.all(), TEST_CASE_FIELDS, query)
+        scenarios = self._filter(TestScenario.objects.all(), TEST_SCENARIO_FIELDS, query)
+        if web_application_id is not None:
+            cases = cases.filter(test_scenario__web_application_id=web_application_id)
+            scenarios = scenarios.filter(web_application_id=web_application_id)
+
+        sources = []
+        if kind in (None, TEST_SCENARIO):
+            sources.append((TEST_SCENARIO, scenarios.values_list('id', 'web_application_id', 'description')))
+        if kind in (None, TEST_CASE):
+            sources.append((TEST_CASE, cases.values_list('id', 'test_scenario__web_application_id', 'description')))
+
+        count = 0
+        hits = []
+        for source_kind, rows in sources:
+            total = rows.count()
+            start = max(offset - count, 0)
+            stop = max(offset + limit - count, 0)
+            for pk, web_app_id, description in rows.order_by('id')[start:stop]:
+                hits.append({
+                    'type': source_kind,
+                    'id': pk,
+                    'web_application_id': web_app_id,
+                    'score': None,
+                    'snippet': description[:200],
+                })
+            count += total
+        return count, hits
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """
+    Full-text index in an FTS5 virtual table that lives next to the regular
+    tables. Test cases and scenarios share the table; the rowid encodes the
+    object type so that updates and deletes are primary key lookups. The
+    ``filters`` column holds one token for the web application and one for
+    the type, so that filtering happens inside the MATCH instead of after it.
+    """
+    table = 'web_api_search_index'
+    kinds = (TEST_CASE, TEST_SCENARIO)
+    ranking_capped = True
+    # Prefix indexes keep search-as-you-type queries from scanning every
+    # term that starts with the last word typed.
+    schema = (
+        f"CREATE VIRTUAL TABLE {table} USING fts5("
+        "kind UNINDEXED, object_id UNINDEXED, web_application_id UNINDEXED, description, details, filters, "
+        "tokenize='porter unicode61', prefix='2 3 4')"
+    )
+
+    def setup(self):
+        """
+        Creates the index table, replacing and refilling one with an older
+        schema. Runs after migrate, outside of any request transaction.
+        """
+        cursor = connection.cursor()
+        cursor.execute("SELECT sql FROM sqlite_master WHERE name = %s", [self.table])
+        row = cursor.fetchone()
+        if row and row[0] == self.schema:
+            return
+        if row:
+            cursor.execute(f"DROP TABLE {self.table}")
+        cursor.execute(self.schema)
+        if row:
+            self.rebuild()
+
+    def _filter_tokens(self, kind=None, web_application_id=None):
+        tokens = []
+        if web_application_id is not None:
+            tokens.append(f"app{int(web_application_id)}")
+        if kind is not None:
+            tokens.append(f"kind{kind.replace('_', '')}")
+        return tokens
+
+    def _rowid(self, kind, pk):
+        return pk * len(self.kinds) + self.kinds.index(kind)
+
+    def _remove(self, cursor, kind, pks):
+        cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", [(self._rowid(kind, pk),) for pk in pks])
+
+    def _index(self, cursor, kind, documents, batch_size=2000):
+        indexed = 0
+        batch = []
+        for document in documents:
+            batch.append(document)
+            if len(batch) >= batch_size:
+                indexed += self._write(cursor, kind, batch)
+                batch = []
+        if batch:
+            indexed += self._write(cursor, kind, batch)
+        return indexed
+
+    def _write(self, cursor, kind, documents):
+        self._remove(cursor, kind, [document[0] for document in documents])
+        cursor.executemany(
+            f"INSERT INTO {self.table} (rowid, kind, object_id, web_application_id, description, details, filters) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            [(self._rowid(kind, pk), kind, pk, web_app_id, description, details,
+              ' '.join(self._filter_tokens(kind, web_app_id)))
+             for pk, web_app_id, description, details in documents]
+        )
+        return len(documents)
+
+    def index_test_cases(self, pks, chunk_size=5000):
+        cursor = connection.cursor()
+        for start in range(0, len(pks), chunk_size):
+            test_cases = TestCase.objects.filter(pk__in=pks[start:start + chunk_size])
+            self._index(cursor, TEST_CASE, test_case_documents(test_cases))
+
+    def index_test_scenarios(self, pks, chunk_size=5000):
+        cursor = connection.cursor()
+        for start in range(0, len(pks), chunk_size):
+            test_scenarios = TestScenario.objects.filter(pk__in=pks[start:start + chunk_size])
+            self._index(cursor, TEST_SCENARIO, test_scenario_documents(test_scenarios))
+
+    def remove_test_cases(self, pks):
+        self._remove(connection.cursor(), TEST_CASE, pks)
+
+    def remove_test_scenarios(self, pks):
+        self._remove(connection.cursor(), TEST_SCENARIO, pks)
+
+    def remove_web_application(self, web_application_id):
+        # One statement for every document of the application, found by its filter token.
+        connection.cursor().execute(
+            f"DELETE FROM {self.table} WHERE rowid IN (SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s)",
+            [f'filters : "{self._filter_tokens(web_application_id=web_application_id)[0]}"']
+        )
+
+    def rebuild(self, batch_size=2000):
+        cursor = connection.cursor()
+        cursor.execute(f"DELETE FROM {self.table}")
+        indexed = self._index(cursor, TEST_SCENARIO, test_scenario_documents(TestScenario.objects.all()), batch_size)
+        indexed += self._index(cursor, TEST_CASE, test_case_documents(TestCase.objects.all()), batch_size)
+        cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+        return indexed
+
+    def _match_expression(self, query, kind=None, web_application_id=None):
+        # Quote every term so user input cannot inject FTS5 syntax; the last
+        # term is matched as a prefix to support search-as-you-type. Terms
+        # only match the text columns, filter tokens only the filters column.
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return None
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += '*'
+        expression = f"{{description details}} : ({' '.join(quoted)})"
+        for token in self._filter_tokens(kind, web_application_id):
+            expression += f' AND filters : "{token}"'
+        return expression
+
+    def search(self, query, web_application_id=None, kind=None, offset=0, limit=20):
+        expression = self._match_expression(query, kind, web_application_id)
+        if expression is None:
+            return 0, []
+
+        cursor = connection.cursor()
+        # Counting stops past count_limit so broad queries stay cheap.
+        cursor.execute(
+            f"SELECT count(*) FROM (SELECT 1 FROM {self.table} WHERE {self.table} MATCH %s LIMIT %s)",
+            [expression, self.count_limit + 1]
+        )
+        count = cursor.fetchone()[0]
+        if offset >= min(count, self.count_limit):
+            return count, []
+
+        where = f"{self.table} MATCH %s"
+        params = [expression]
+        if count > self.count_limit:
+            # bm25 has to score every match it sorts, so broad queries are
+            # ranked within their count_limit most recent matches only.
+            cursor.execute(
+                f"SELECT min(rowid) FROM (SELECT rowid FROM {self.table} WHERE {where} ORDER BY rowid DESC LIMIT %s)",
+                params + [self.count_limit]
+            )
+            where += " AND rowid >= %s"
+            params.append(cursor.fetchone()[0])
+
+        # Only the description and details columns weigh into the ranking.
+        cursor.execute(
+            f"SELECT kind, object_id, web_application_id, bm25({self.table}, 0, 0, 0, 1, 1, 0), "
+            f"snippet({self.table}, 3, '[', ']', '...', 16), snippet({self.table}, 4, '[', ']', '...', 16) "
+            f"FROM {self.table} WHERE {where} ORDER BY 4 LIMIT %s OFFSET %s",
+            params + [limit, offset]
+        )
+        hits = [
+            {
+                'type': row_kind,
+                'id': pk,
+                'web_application_id': web_app_id,
+                'score': -score,
+                # Highlight from the description unless only the details matched.
+                'snippet': description if '[' in description else details,
+            }
+            for row_kind, pk, web_app_id, score, description, details in cursor.fetchall()
+        ]
+        return count, hits
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    """
+    Returns the backend named by the ``SEARCH_BACKEND`` setting, defaulting to
+    FTS5 on SQLite and the unindexed fallback elsewhere.
+    """
+    path = getattr(settings, 'SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    if connection.vendor == 'sqlite':
+        return SQLiteFTS5Backend()
+    return DatabaseSearchBackend()
@@ -20,7 +20,7 @@ class TestCaseSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'test_case_id', 'description', 'pre_conditions', 'test_steps',
             'test_data', 'expected_result', 'post_conditions', 'actual_result',
-            'status', 'priority', 'test_environment', 'test_case_type',
+            'status', 'execution_time', 'executed_at', 'priority', 'test_environment', 'test_case_type',
             'tester_name', 'date'
         ]
 
@@ -0,0 +1,114 @@
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import WebApplication, TestScenario, TestCase
+from .stats import DIMENSIONS, TRACKED_FIELDS, deltas_for_case, apply_deltas, count_by_dimension_for
+from .search import (
+    TEST_CASE_INDEXED_FIELDS, TEST_SCENARIO_INDEXED_FIELDS, get_search_backend, test_case_pks_for_scenarios,
+)
+
+
+def _case_values(case):
+    return {dimension: getattr(case, dimension) for dimension in DIMENSIONS}
+
+
+def _tracks_stats(update_fields):
+    return update_fields is None or bool(TRACKED_FIELDS.intersection(update_fields))
+
+
+@receiver(pre_save, sender=TestCase)
+def remember_test_case_stats(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Snapshot the stored row so post_save can move the case between buckets.
+    instance._stats_previous = None
+    if raw or instance.pk is None or not _tracks_stats(update_fields):
+        return
+
+    previous = (
+        TestCase.objects.filter(pk=instance.pk)
+        .values('test_scenario__web_application_id', *DIMENSIONS)
+        .first()
+    )
+    if previous:
+        instance._stats_previous = previous
+
+
+@receiver(post_save, sender=TestCase)
+def update_test_case_stats(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not _tracks_stats(update_fields):
+        return
+
+    deltas = deltas_for_case(instance.test_scenario.web_application_id, _case_values(instance), 1)
+    previous = getattr(instance, '_stats_previous', None)
+    if previous:
+        deltas.subtract(deltas_for_case(previous.pop('test_scenario__web_application_id'), previous, 1))
+    apply_deltas(deltas)
+
+
+@receiver(pre_save, sender=TestScenario)
+def remember_test_scenario_application(sender, instance, raw=False, **kwargs):
+    # A scenario moved to another application takes its cases' counts along.
+    instance._previous_web_application_id = None
+    instance._stats_before = None
+    if raw or instance.pk is None:
+        return
+
+    previous = (
+        TestScenario.objects.filter(pk=instance.pk)
+        .values_list('web_application_id', flat=True)
+        .first()
+    )
+    if previous is not None and previous != instance.web_application_id:
+        instance._previous_web_application_id = previous
+        instance._stats_before = count_by_dimension_for([instance.pk], field='test_scenario_id')
+
+
+@receiver(post_save, sender=TestScenario)
+def move_test_scenario_stats(sender, instance, raw=False, **kwargs):
+    before = getattr(instance, '_stats_before', None)
+    if raw or before is None:
+        return
+
+    after = count_by_dimension_for([instance.pk], field='test_scenario_id')
+    after.subtract(before)
+    apply_deltas(after)
+    instance._stats_before = None
+
+
+def _needs_reindex(update_fields, indexed_fields):
+    return update_fields is None or bool(indexed_fields.intersection(update_fields))
+
+
+@receiver(post_save, sender=TestCase)
+def index_test_case(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and _needs_reindex(update_fields, TEST_CASE_INDEXED_FIELDS):
+        get_search_backend().index_test_cases([instance.pk])
+
+
+@receiver(post_save, sender=TestScenario)
+def index_test_scenario(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and _needs_reindex(update_fields, TEST_SCENARIO_INDEXED_FIELDS):
+        get_search_backend().index_test_scenarios([instance.pk])
+    if not raw and getattr(instance, '_previous_web_application_id', None) is not None:
+        # Test case documents carry their scenario's web application.
+        get_search_backend().index_test_cases(test_case_pks_for_scenarios([instance.pk]))
+
+
+def _deletes(origin, model):
+    return isinstance(origin, model) or isinstance(origin, QuerySet) and origin.model is model
+
+
+# Deletes are accounted for per scenario, not per test case: TestCase has no
+# delete receivers so that cascades remove its rows in one statement, and
+# TrackedQuerySet.delete() handles deletes of case and scenario querysets.
+@receiver(pre_delete, sender=TestScenario)
+def remove_test_scenario(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, QuerySet) and origin.model is TestScenario or _deletes(origin, WebApplication):
+        # Already counted for the whole queryset, or the stats go with the application.
+        return
+    TestScenario.objects.filter(pk=instance.pk).before_delete()
+
+
+@receiver(pre_delete, sender=WebApplication)
+def remove_web_application_documents(sender, instance, **kwargs):
+    get_search_backend().remove_web_application(instance.pk)
@@ -0,0 +1,142 @@
+from collections import Counter
+
+from django.db.models import Count, F
+
+from .models import TestScenario, TestCase, TestCaseStat
+
+# TestCase columns that are counted per web application.
+DIMENSIONS = ('status', 'priority', 'test_case_type')
+TOTAL = 'total'
+
+# Writes touching any of these fields can move a case between buckets.
+TRACKED_FIELDS = frozenset(DIMENSIONS + ('test_scenario', 'test_scenario_id'))
+
+# TestScenario fields whose changes move all of the scenario's cases.
+SCENARIO_TRACKED_FIELDS = frozenset(('web_application', 'web_application_id'))
+
+
+def case_keys(web_application_id, values):
+    """
+    Returns the stat keys a single test case contributes to, given its
+    web application and a mapping of dimension name to value.
+    """
+    keys = [(web_application_id, TOTAL, '')]
+    for dimension in DIMENSIONS:
+        keys.append((web_application_id, dimension, values.get(dimension) or ''))
+    return keys
+
+
+def deltas_for_case(web_application_id, values, sign):
+    deltas = Counter()
+    for key in case_keys(web_application_id, values):
+        deltas[key] += sign
+    return deltas
+
+
+def deltas_for_new_cases(cases):
+    scenario_ids = {case.test_scenario_id for case in cases}
+    web_app_ids = dict(
+        TestScenario.objects.filter(id__in=scenario_ids).values_list('id', 'web_application_id')
+    )
+
+    deltas = Counter()
+    for case in cases:
+        values = {dimension: getattr(case, dimension) for dimension in DIMENSIONS}
+        deltas.update(deltas_for_case(web_app_ids[case.test_scenario_id], values, 1))
+    return deltas
+
+
+def count_by_dimension(test_cases):
+    """
+    Aggregates a TestCase queryset into stat keys. Used both to diff bulk
+    updates and to rebuild the table from scratch.
+    """
+    web_app = 'test_scenario__web_application_id'
+    counts = Counter()
+
+    for row in test_cases.values(web_app).annotate(n=Count('id')).order_by():
+        counts[(row[web_app], TOTAL, '')] = row['n']
+
+    for dimension in DIMENSIONS:
+        rows = test_cases.values(web_app, dimension).annotate(n=Count('id')).order_by()
+        for row in rows:
+            counts[(row[web_app], dimension, row[dimension] or '')] = row['n']
+
+    return counts
+
+
+def count_by_dimension_for(pks, field='pk', chunk_size=5000):
+    """
+    count_by_dimension() over the test cases whose ``field`` is one of
+    ``pks``, queried in chunks to stay under the database's limit on query
+    parameters. Pass ``field='test_scenario_id'`` to count by scenario.
+    """
+    counts = Counter()
+    for start in range(0, len(pks), chunk_size):
+        test_cases = TestCase.objects.filter(**{f'{field}__in': pks[start:start + chunk_size]})
+        counts.update(count_by_dimension(test_cases))
+    return counts
+
+
+def apply_deltas(deltas):
+    """
+    Applies signed count changes to TestCaseStat using atomic increments.
+    Decrements never create rows, so stats removed by a cascading
+    WebApplication delete are not resurrected.
+    """
+    for (web_application_id, dimension, value), delta in deltas.items():
+        if not delta:
+            continue
+
+        stats = TestCaseStat.objects.filter(
+            web_application_id=web_application_id, dimension=dimension, value=value
+        )
+        if stats.update(count=F('count') + delta) or delta < 0:
+            continue
+
+        stat, created = TestCaseStat.objects.get_or_create(
+            web_application_id=web_application_id, dimension=dimension, value=value,
+            defaults={'count': delta}
+        )
+        if not created:
+            stats.update(count=F('count') + delta)
+
+
+def get_stats(web_application):
+    """
+    Reads the summary for one web application from the precomputed rows.
+    """
+    summary = {'total': 0}
+    for dimension in DIMENSIONS:
+        summary[dimension] = {}
+
+    stats = TestCaseStat.objects.filter(web_application=web_application, count__gt=0)
+    for dimension, value, count in stats.values_list('dimension', 'value', 'count'):
+        if dimension == TOTAL:
+            summary['total'] = count
+        elif dimension in summary:
+            summary[dimension][value] = count
+
+    return summary
+
+
+def stored_counts():
+    stats = TestCaseStat.objects.filter(count__gt=0)
+    return Counter({
+        (web_application_id, dimension, value): count
+        for web_application_id, dimension, value, count
+        in stats.values_list('web_application_id', 'dimension', 'value', 'count')
+    })
+
+
+def rebuild_stats():
+    """
+    Recomputes every TestCaseStat row from the TestCase table.
+    """
+    counts = count_by_dimension(TestCase.objects.all())
+    TestCaseStat.objects.all().delete()
+    TestCaseStat.objects.bulk_create([
+        TestCaseStat(web_application_id=web_application_id, dimension=dimension, value=value, count=count)
+        for (web_application_id, dimension, value), count in counts.items()
+    ], batch_size=1000)
+    return counts
@@ -0,0 +1,75 @@
+"""
+Test doubles shared by the app's tests and the benchmarks in ``benchmarks``.
+"""
+from urllib.parse import urljoin, urlsplit
+
+
+class StaticElement:
+    """
+    The parts of a selenium WebElement that the crawler reads, backed by a
+    BeautifulSoup tag.
+    """
+
+    def __init__(self, tag, page_url):
+        self.tag = tag
+        self.page_url = page_url
+
+    @property
+    def text(self):
+        return self.tag.get_text(' ', strip=True)
+
+    def get_attribute(self, name):
+        value = self.tag.get(name)
+        if name == 'href' and value is not None:
+            # Browsers report resolved links.
+            return urljoin(self.page_url, value)
+        return value
+
+
+class StaticDriver:
+    """
+    Stand-in for ``webdriver.Chrome`` that loads pages from a mapping of path
+    to HTML, such as a generated site (see ``benchmarks.fixture_site``),
+    without a browser. Elements can be listed but not interacted with:
+    ``find_element`` raises NoSuchElementException, which the crawler records
+    as a failed interaction. ``sessions`` and ``interactions`` count across
+    all instances created through ``factory``.
+    """
+
+    def __init__(self, pages, counters):
+        self.pages = pages
+        self.counters = counters
+        self.counters['sessions'] += 1
+        self.current_url = 'about:blank'
+        self.page_source = '<html></html>'
+
+    @classmethod
+    def factory(cls, pages):
+        counters = {'sessions': 0, 'interactions': 0}
+
+        def create(*args, **kwargs):
+            return cls(pages, counters)
+        create.counters = counters
+        return create
+
+    def get(self, url):
+        self.current_url = url
+        self.page_source = self.pages.get(urlsplit(url).path, '<html></html>')
+
+    def find_elements(self, by, value):
+        from bs4 import BeautifulSoup
+        from selenium.webdriver.common.by import By
+
+        if by != By.TAG_NAME:
+            return []
+        soup = BeautifulSoup(self.page_source, 'html.parser')
+        return [StaticElement(tag, self.current_url) for tag in soup.find_all(value)]
+
+    def find_element(self, by, value):
+        from selenium.common.exceptions import NoSuchElementException
+
+        self.counters['interactions'] += 1
+        raise NoSuchElementException(f"{value} cannot be interacted with without a browser")
+
+    def quit(self):
+        pass
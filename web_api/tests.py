@@ -1,3 +1,802 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO, StringIO
+from tempfile import NamedTemporaryFile
+from unittest import mock
 
-# Create your tests here.
+import openpyxl
+from bs4 import BeautifulSoup
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from . import crawl, execution
+from .crawl import run_crawl
+from .crawler import fetch_features_from_url, store_feature, store_features_in_db
+from .dedup import ComponentDeduplicator, element_signature
+from .execution import describe_job
+from .exporter import generate_test_scenarios_and_cases_excel
+from .importer import ImportFileError, import_test_cases
+from .models import WebApplication, CrawlJob, Feature, TestScenario, TestCase as TestCaseModel
+from .runner import run_test_cases
+from .search import TEST_CASE, TEST_SCENARIO, get_search_backend
+from .stats import get_stats
+from .testing import StaticDriver
+
+
+def create_scenario(web_application, name='Forms', index=0):
+    feature = Feature.objects.create(web_application=web_application, name=name, description=f"{name} {index}")
+    return TestScenario.objects.create(
+        web_application=web_application,
+        feature=feature,
+        scenario_id=f"TS_{name.upper()}_{feature.id}",
+        description=f"Validating form 'form_{index}' submission.",
+        purpose=f"Ensure that form 'form_{index}' handles input data and submission correctly.",
+    )
+
+
+def build_case(scenario, index=0, **values):
+    fields = {
+        'test_scenario': scenario,
+        'test_case_id': f"TC_FORM_{scenario.feature_id}_{index:03}",
+        'description': f"Verify that the form 'form_{index}' submits correctly with valid data.",
+        'pre_conditions': "The form is visible and accessible on the page.",
+        'test_steps': f"1. Fill out the form 'form_{index}' with valid data.\n2. Submit the form.",
+        'expected_result': "Form is submitted successfully, and user receives confirmation.",
+        'priority': 'High',
+        'test_environment': "Browser: Chrome, OS: Windows 10",
+        'test_case_type': '',
+        'tester_name': "Auto Generated",
+    }
+    fields.update(values)
+    return TestCaseModel(**fields)
+
+
+class TestCaseStatsTests(TestCase):
+    def setUp(self):
+        self.web_application = WebApplication.objects.create(name='Shop', url='http://shop.test/')
+        self.other_application = WebApplication.objects.create(name='Blog', url='http://blog.test/')
+        self.scenario = create_scenario(self.web_application)
+
+    def assertStatsConsistent(self):
+        output = StringIO()
+        call_command('rebuild_test_case_stats', check=True, stdout=output)
+        self.assertIn('consistent', output.getvalue())
+
+    def test_save_and_update(self):
+        case = build_case(self.scenario)
+        case.save()
+        case.status = 'Pass'
+        case.save()
+        TestCaseModel.objects.filter(pk=case.pk).update(priority='Low')
+
+        stats = get_stats(self.web_application)
+        self.assertEqual(stats['total'], 1)
+        self.assertEqual(stats['status'], {'Pass': 1})
+        self.assertEqual(stats['priority'], {'Low': 1})
+        self.assertStatsConsistent()
+
+    def test_bulk_create_and_bulk_update(self):
+        cases = TestCaseModel.objects.bulk_create([build_case(self.scenario, i) for i in range(5)])
+        for case in cases[:3]:
+            case.status = 'Fail'
+        TestCaseModel.objects.bulk_update(cases[:3], ['status'])
+
+        stats = get_stats(self.web_application)
+        self.assertEqual(stats['total'], 5)
+        self.assertEqual(stats['status'], {'Fail': 3, '': 2})
+        self.assertStatsConsistent()
+
+    def test_cascade_delete(self):
+        TestCaseModel.objects.bulk_create([build_case(self.scenario, i) for i in range(3)])
+        other = create_scenario(self.web_application, index=1)
+        build_case(other, status='Pass').save()
+
+        self.scenario.delete()
+        self.assertEqual(get_stats(self.web_application)['total'], 1)
+        self.assertStatsConsistent()
+
+        self.web_application.delete()
+        self.assertStatsConsistent()
+
+    def test_deletes_are_batched(self):
+        TestCaseModel.objects.bulk_create([
+            build_case(self.scenario, i, status='Pass' if i % 2 else 'Fail') for i in range(201)
+        ])
+        other = create_scenario(self.web_application, index=1)
+        TestCaseModel.objects.bulk_create([build_case(other, i) for i in range(50)])
+        third = create_scenario(self.web_application, index=2)
+        TestCaseModel.objects.bulk_create([build_case(third, i) for i in range(50)])
+
+        with CaptureQueriesContext(connection) as queries:
+            deleted, _ = TestCaseModel.objects.filter(test_scenario=self.scenario).delete()
+        self.assertEqual(deleted, 201)
+        self.assertLess(len(queries), 20)
+        self.assertEqual(get_stats(self.web_application)['total'], 100)
+        self.assertStatsConsistent()
+
+        TestCaseModel.objects.filter(test_scenario=other).first().delete()
+        with CaptureQueriesContext(connection) as queries:
+            other.delete()
+        self.assertLess(len(queries), 20)
+        self.assertEqual(get_stats(self.web_application)['total'], 50)
+        self.assertStatsConsistent()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.web_application.delete()
+        self.assertLess(len(queries), 20)
+        self.assertStatsConsistent()
+
+    def test_save_of_untracked_fields_skips_stats(self):
+        case = build_case(self.scenario)
+        case.save()
+        case.actual_result = "Confirmation shown"
+        with self.assertNumQueries(1):
+            case.save(update_fields=['actual_result'])
+        case.status = 'Pass'
+        case.save(update_fields=['status'])
+        self.assertEqual(get_stats(self.web_application)['status'], {'Pass': 1})
+        self.assertStatsConsistent()
+
+    def test_scenario_moved_by_save(self):
+        TestCaseModel.objects.bulk_create([build_case(self.scenario, i, status='Pass') for i in range(4)])
+
+        self.scenario.web_application = self.other_application
+        self.scenario.save()
+
+        self.assertEqual(get_stats(self.web_application)['total'], 0)
+        self.assertEqual(get_stats(self.other_application)['status'], {'Pass': 4})
+        self.assertStatsConsistent()
+
+    def test_scenario_moved_by_update(self):
+        TestCaseModel.objects.bulk_create([build_case(self.scenario, i) for i in range(2)])
+
+        TestScenario.objects.filter(pk=self.scenario.pk).update(web_application=self.other_application)
+
+        self.assertEqual(get_stats(self.web_application)['total'], 0)
+        self.assertEqual(get_stats(self.other_application)['total'], 2)
+        self.assertStatsConsistent()
+
+    def test_update_with_expression(self):
+        build_case(self.scenario, priority='Medium').save()
+
+        TestCaseModel.objects.update(test_case_type=F('priority'))
+
+        self.assertEqual(get_stats(self.web_application)['test_case_type'], {'Medium': 1})
+        self.assertStatsConsistent()
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.backend = get_search_backend()
+        self.web_application = WebApplication.objects.create(name='Shop', url='http://shop.test/')
+        self.other_application = WebApplication.objects.create(name='Blog', url='http://blog.test/')
+        self.scenario = create_scenario(self.web_application)
+        self.case = build_case(self.scenario, description="Verify the checkout form accepts coupons.")
+        self.case.save()
+
+    def search(self, query, **kwargs):
+        count, hits = self.backend.search(query, **kwargs)
+        return count, [(hit['type'], hit['id']) for hit in hits]
+
+    def test_index_follows_writes(self):
+        self.assertEqual(self.search('coupons'), (1, [(TEST_CASE, self.case.pk)]))
+
+        self.case.description = "Verify the checkout form accepts gift cards."
+        self.case.save()
+        self.assertEqual(self.search('coupons')[0], 0)
+        self.assertEqual(self.search('gift')[0], 1)
+
+        TestCaseModel.objects.filter(pk=self.case.pk).update(description="Refund flow")
+        self.assertEqual(self.search('refund')[0], 1)
+
+        self.case.delete()
+        self.assertEqual(self.search('refund')[0], 0)
+
+    def test_bulk_writes_are_indexed(self):
+        cases = TestCaseModel.objects.bulk_create([
+            build_case(self.scenario, i, description=f"Newsletter signup {i}") for i in range(1, 4)
+        ])
+        self.assertEqual(self.search('newsletter')[0], 3)
+
+        for case in cases:
+            case.description = "Password reset"
+        TestCaseModel.objects.bulk_update(cases, ['description'])
+        self.assertEqual(self.search('newsletter')[0], 0)
+        self.assertEqual(self.search('password reset')[0], 3)
+
+    def test_prefix_and_filters(self):
+        self.assertEqual(self.search('checko')[0], 1)
+        self.assertEqual(self.search('form', kind=TEST_SCENARIO), (1, [(TEST_SCENARIO, self.scenario.pk)]))
+        self.assertEqual(self.search('coupons', web_application_id=self.other_application.id)[0], 0)
+
+    def test_scenario_move_reindexes_cases(self):
+        self.scenario.web_application = self.other_application
+        self.scenario.save()
+        self.assertEqual(
+            self.search('coupons', web_application_id=self.other_application.id),
+            (1, [(TEST_CASE, self.case.pk)]),
+        )
+
+        TestScenario.objects.filter(pk=self.scenario.pk).update(web_application=self.web_application)
+        self.assertEqual(self.search('coupons', web_application_id=self.web_application.id)[0], 1)
+        self.assertEqual(self.search('coupons', web_application_id=self.other_application.id)[0], 0)
+
+    def test_deletes_remove_documents(self):
+        other = create_scenario(self.other_application, index=1)
+        TestCaseModel.objects.bulk_create([build_case(other, i, description="Coupons elsewhere") for i in range(3)])
+        cases = TestCaseModel.objects.bulk_create([
+            build_case(self.scenario, i, description="Coupons again") for i in range(1, 4)
+        ])
+
+        TestCaseModel.objects.filter(pk__in=[case.pk for case in cases[:2]]).delete()
+        self.assertEqual(self.search('coupons', web_application_id=self.web_application.id)[0], 2)
+
+        TestScenario.objects.filter(pk=self.scenario.pk).delete()
+        self.assertEqual(self.search('coupons', web_application_id=self.web_application.id)[0], 0)
+        self.assertEqual(self.search('form', kind=TEST_SCENARIO)[0], 1)
+
+        self.other_application.delete()
+        self.assertEqual(self.search('coupons'), (0, []))
+        self.assertEqual(self.search('form'), (0, []))
+
+    def test_query_syntax_is_escaped(self):
+        for query in ('"coupons', 'coupons OR', 'NEAR(coupons', 'description:coupons', 'coupons*^', '{details}'):
+            self.backend.search(query)
+        # Operators are plain terms: 'and' appears in the expected result.
+        self.assertEqual(self.search('coupons AND')[0], 1)
+        self.assertEqual(self.search('coupons OR missing')[0], 0)
+        self.assertEqual(self.search('!!!'), (0, []))
+
+    def test_broad_queries_are_capped(self):
+        cases = TestCaseModel.objects.bulk_create([
+            build_case(self.scenario, i, description="Coupons again") for i in range(1, 4)
+        ])
+        with mock.patch.object(self.backend, 'count_limit', 2):
+            count, hits = self.search('coupons', limit=10)
+            self.assertEqual(self.search('coupons', offset=2), (3, []))
+        # count_limit + 1 of the 4 matches, ranked within the most recent two.
+        self.assertEqual(count, 3)
+        self.assertEqual(sorted(pk for _, pk in hits), [cases[1].pk, cases[2].pk])
+
+        with mock.patch.object(self.backend, 'count_limit', 2):
+            response = self.client.get('/webapis/search/', {'q': 'coupons'}).json()
+        self.assertEqual((response['count'], response['count_capped'], response['ranking_capped']), (2, True, True))
+        response = self.client.get('/webapis/search/', {'q': 'coupons'}).json()
+        self.assertEqual((response['count'], response['count_capped'], response['ranking_capped']), (4, False, False))
+
+
+def fake_run_shard(jobs, retries=0, fail_fast=False):
+    # Stands in for the browser: target 'broken' fails and 'crash' raises.
+    results = []
+    for job in jobs:
+        if job['target'] == 'crash':
+            raise RuntimeError("browser could not be restarted")
+        passed = job['target'] != 'broken'
+        results.append({
+            'id': job['id'],
+            'status': 'Pass' if passed else 'Fail',
+            'actual_result': 'ok' if passed else 'failed',
+            'execution_time': 0.1,
+        })
+        if fail_fast and not passed:
+            break
+    return results
+
+
+@mock.patch('web_api.runner.init_worker', lambda *args: None)
+@mock.patch('web_api.runner.run_shard', fake_run_shard)
+@mock.patch('web_api.runner.ProcessPoolExecutor', ThreadPoolExecutor)
+class RunnerTests(TestCase):
+    def setUp(self):
+        self.web_application = WebApplication.objects.create(name='Shop', url='http://shop.test/')
+        self.scenario = create_scenario(self.web_application)
+
+    def create_cases(self, targets):
+        return TestCaseModel.objects.bulk_create([
+            build_case(self.scenario, i, test_steps=f"1. Fill out the form '{target}' with valid data.")
+            for i, target in enumerate(targets)
+        ])
+
+    def test_describe_job(self):
+        job = describe_job(
+            7, 'Links', 'http://shop.test/',
+            "1. Click the link 'Pricing'.\n2. Verify the navigation to 'http://shop.test/pricing/'."
+        )
+        self.assertEqual(job, {
+            'id': 7, 'kind': 'links', 'url': 'http://shop.test/',
+            'target': 'Pricing', 'href': 'http://shop.test/pricing/',
+        })
+        job = describe_job(8, 'Buttons', 'http://shop.test/', "1. Click the button 'Buy'.\n2. Observe.")
+        self.assertEqual((job['kind'], job['target'], job['href']), ('buttons', 'Buy', None))
+        self.assertIsNone(describe_job(9, 'Widgets', 'http://shop.test/', "1. Interact.")['target'])
+
+    def test_results_are_saved(self):
+        cases = self.create_cases(['login', 'broken', 'signup'])
+
+        summary = run_test_cases(self.web_application, workers=2, shard_size=1, batch_size=2)
+
+        self.assertEqual((summary['executed'], summary['passed'], summary['failed']), (3, 2, 1))
+        statuses = dict(TestCaseModel.objects.values_list('id', 'status'))
+        self.assertEqual([statuses[case.id] for case in cases], ['Pass', 'Fail', 'Pass'])
+        self.assertEqual(get_stats(self.web_application)['status'], {'Pass': 2, 'Fail': 1})
+
+    def test_failing_shard_keeps_other_results(self):
+        cases = self.create_cases(['login'] * 4 + ['crash'] + ['signup'] * 4)
+
+        summary = run_test_cases(self.web_application, workers=2, shard_size=2, batch_size=100)
+
+        self.assertEqual(summary['executed'], 9)
+        rows = dict(TestCaseModel.objects.values_list('id', 'actual_result'))
+        self.assertEqual(sum(rows[case.id] == 'ok' for case in cases), 7)
+        # The crashing shard holds the 5th and 6th cases.
+        for case in cases[4:6]:
+            self.assertIn('browser could not be restarted', rows[case.id])
+
+    def test_partial_results_are_flushed_when_the_pool_breaks(self):
+        last = self.create_cases(['login'] * 6)[-1]
+
+        def break_pool(jobs, retries=0, fail_fast=False):
+            if jobs[0]['id'] == last.id:
+                raise BrokenProcessPool("worker died")
+            return fake_run_shard(jobs)
+
+        with mock.patch('web_api.runner.run_shard', break_pool):
+            with self.assertRaises(BrokenProcessPool):
+                run_test_cases(self.web_application, workers=1, shard_size=1, batch_size=100)
+        self.assertEqual(TestCaseModel.objects.filter(status='Pass').count(), 5)
+
+    def test_fail_fast(self):
+        self.create_cases(['broken'] + ['login'] * 20)
+
+        summary = run_test_cases(self.web_application, workers=1, shard_size=1, fail_fast=True)
+
+        self.assertTrue(summary['stopped_early'])
+        self.assertLess(summary['executed'], 21)
+        self.assertEqual(TestCaseModel.objects.filter(status='Fail').count(), 1)
+        self.assertEqual(TestCaseModel.objects.exclude(status=None).count(), summary['executed'])
+
+
+class ScriptedElement:
+    def __init__(self, browser):
+        self.browser = browser
+        self.tag_name = 'form'
+
+    def find_elements(self, by, value):
+        return [ScriptedElement(self.browser)]
+
+    def get_attribute(self, name):
+        return 'text'
+
+    def clear(self):
+        pass
+
+    def send_keys(self, value):
+        self.browser.typed.append(value)
+
+    def click(self):
+        self.browser.current_url = self.browser.navigates_to
+
+    submit = click
+
+
+class ScriptedBrowser:
+    """
+    Browser double for execution.run_shard. Every element can be found, and
+    clicking or submitting one navigates to ``navigates_to``. ``get`` raises
+    the queued ``errors`` first; after ``crash`` the session is dead.
+    """
+
+    def __init__(self, navigates_to='http://shop.test/done/', errors=()):
+        self.navigates_to = navigates_to
+        self.errors = list(errors)
+        self.visits = []
+        self.typed = []
+        self.alive = True
+        self._current_url = 'about:blank'
+        self.switch_to = mock.Mock()  # An alert is always present.
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise WebDriverException("invalid session id")
+        return self._current_url
+
+    @current_url.setter
+    def current_url(self, url):
+        self._current_url = url
+
+    def crash(self):
+        self.alive = False
+
+    def get(self, url):
+        if not self.alive:
+            raise WebDriverException("invalid session id")
+        self.visits.append(url)
+        if self.errors:
+            raise self.errors.pop(0)
+        self.current_url = url
+
+    def find_elements(self, by, value):
+        return [ScriptedElement(self)]
+
+    def find_element(self, by, value):
+        return ScriptedElement(self)
+
+    def quit(self):
+        self.alive = False
+
+
+def job(kind, target='signup', href=None, test_case_id=1):
+    return {'id': test_case_id, 'kind': kind, 'url': 'http://shop.test/', 'target': target, 'href': href}
+
+
+class ShardExecutionTests(SimpleTestCase):
+    def setUp(self):
+        self.browser = ScriptedBrowser()
+        self.started = []
+        patches = (
+            mock.patch('web_api.execution._driver', self.browser),
+            mock.patch('web_api.execution._start_driver', self.start_driver),
+            mock.patch.dict('web_api.execution._options', timeout=1),
+        )
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def start_driver(self):
+        self.browser = ScriptedBrowser()
+        self.started.append(self.browser)
+        execution._driver = self.browser
+
+    def run_jobs(self, jobs, **kwargs):
+        results = execution.run_shard(jobs, **kwargs)
+        return [(result['id'], result['status'], result['actual_result']) for result in results]
+
+    def test_interactions(self):
+        results = self.run_jobs([
+            job('forms', test_case_id=1),
+            job('buttons', 'Accept', test_case_id=2),
+            job('links', 'Done', href='http://shop.test/done/', test_case_id=3),
+            job('links', 'Pricing', href='http://shop.test/pricing/', test_case_id=4),
+            job('widgets', test_case_id=5),
+        ])
+
+        self.assertEqual(results, [
+            (1, 'Pass', "Form submitted; navigated to 'http://shop.test/done/'."),
+            (2, 'Pass', "Button 'Accept' clicked; alert handled."),
+            (3, 'Pass', "Navigated to 'http://shop.test/done/'."),
+            (4, 'Fail', "Navigated to 'http://shop.test/done/' instead of 'http://shop.test/pricing/'."),
+            (5, 'Fail', "No runner for feature type 'widgets'."),
+        ])
+        self.assertEqual(self.browser.typed, ['test'])
+        self.assertEqual(len(self.browser.visits), 4)
+
+    def test_retries(self):
+        self.browser.errors = [TimeoutException(), TimeoutException()]
+
+        self.assertEqual(self.run_jobs([job('forms')], retries=1), [
+            (1, 'Fail', "Timed out waiting for the expected navigation. (attempts: 2)"),
+        ])
+        self.assertEqual(self.run_jobs([job('forms')], retries=1), [
+            (1, 'Pass', "Form submitted; navigated to 'http://shop.test/done/'."),
+        ])
+
+    def test_dead_session_is_replaced(self):
+        dead = self.browser
+        dead.crash()
+
+        results = self.run_jobs([job('forms', test_case_id=1), job('forms', test_case_id=2)])
+
+        self.assertEqual(results[0], (1, 'Fail', "error: invalid session id"))
+        self.assertEqual(results[1][1], 'Pass')
+        self.assertEqual(len(self.started), 1)
+        self.assertIsNot(execution._driver, dead)
+
+    def test_browser_that_cannot_restart_reports_why(self):
+        self.browser.crash()
+        with mock.patch('web_api.execution._start_driver', side_effect=WebDriverException("chrome not reachable")):
+            results = self.run_jobs([job('forms', test_case_id=1), job('forms', test_case_id=2)])
+
+        self.assertEqual(results, [
+            (1, 'Fail', "error: invalid session id"),
+            (2, 'Fail', "error: Browser could not be started: chrome not reachable"),
+        ])
+
+    def test_fail_fast(self):
+        self.browser.errors = [WebDriverException("net::ERR_CONNECTION_REFUSED")]
+
+        results = self.run_jobs([job('forms', test_case_id=1), job('forms', test_case_id=2)], fail_fast=True)
+
+        self.assertEqual(results, [(1, 'Fail', "error: net::ERR_CONNECTION_REFUSED")])
+
+
+class BulkUpdateTests(TestCase):
+    def setUp(self):
+        self.web_application = WebApplication.objects.create(name='Shop', url='http://shop.test/')
+        self.scenario = create_scenario(self.web_application)
+        self.cases = TestCaseModel.objects.bulk_create([build_case(self.scenario, i) for i in range(3)])
+
+    def test_bulk_update_keeps_django_semantics(self):
+        for case in self.cases:
+            case.test_case_type = F('priority')
+        self.assertEqual(TestCaseModel.objects.bulk_update(self.cases, ['test_case_type']), 3)
+        self.assertEqual(set(TestCaseModel.objects.values_list('test_case_type', flat=True)), {'High'})
+        self.assertEqual(get_stats(self.web_application)['test_case_type'], {'High': 3})
+
+        with self.assertRaises(ValueError):
+            TestCaseModel.objects.bulk_update(self.cases, [])
+
+    def test_update_by_pk(self):
+        missing = build_case(self.scenario, 9, status='Pass')
+        missing.id = self.cases[-1].id + 100
+        for case in self.cases:
+            case.status = 'Pass'
+
+        self.assertEqual(TestCaseModel.objects.update_by_pk(self.cases + [missing], ['status'], batch_size=2), 3)
+        self.assertEqual(get_stats(self.web_application)['status'], {'Pass': 3})
+
+    def test_update_by_pk_rejects_unsupported_writes(self):
+        for fields in ([], ['id']):
+            with self.assertRaises(ValueError):
+                TestCaseModel.objects.update_by_pk(self.cases, fields)
+
+        self.cases[0].priority = F('status')
+        with self.assertRaises(ValueError):
+            TestCaseModel.objects.update_by_pk(self.cases, ['priority'])
+        self.assertEqual(TestCaseModel.objects.filter(priority='High').count(), 3)
+
+
+class ImportTests(TestCase):
+    def setUp(self):
+        self.web_application = WebApplication.objects.create(name='Shop', url='http://shop.test/')
+        self.scenario = create_scenario(self.web_application)
+        self.case = build_case(self.scenario)
+        self.case.save()
+
+    def export(self):
+        output = BytesIO()
+        generate_test_scenarios_and_cases_excel(TestScenario.objects.all(), TestCaseModel.objects.all()).save(output)
+        output.seek(0)
+        return openpyxl.load_workbook(output)
+
+    def upload(self, content, name):
+        return self.client.post('/webapis/import-tcts/', {'file': SimpleUploadedFile(name, content)})
+
+    def test_xlsx_round_trip(self):
+        workbook = self.export()
+        workbook['Test Scenarios']['D2'] = "Edited purpose"
+        cases = workbook['Test Cases']
+        cases['I2'], cases['J2'] = "Confirmation shown", 'pass'
+        cases.append(['TC_NEW_001', self.scenario.scenario_id, "New case", "", "1. Step", "", "Result",
+                      "", "", "", 'Low', "Chrome", "Tester"])
+        output = BytesIO()
+        workbook.save(output)
+
+        response = self.upload(output.getvalue(), 'edited.xlsx')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual(response.json()['updated'], 2)
+        self.case.refresh_from_db()
+        self.assertEqual((self.case.actual_result, self.case.status), ("Confirmation shown", 'Pass'))
+        self.assertEqual(TestScenario.objects.get().purpose, "Edited purpose")
+        self.assertEqual(get_stats(self.web_application)['priority'], {'High': 1, 'Low': 1})
+
+    def test_csv_with_row_errors(self):
+        content = (
+            "Test Case ID,Scenario ID,Status,Priority,Tester Name\n"
+            f"{self.case.test_case_id},{self.scenario.scenario_id},Fail,High,Tester\n"
+            f"{self.case.test_case_id},{self.scenario.scenario_id},Maybe,High,Tester\n"
+            f"TC_X,TS_UNKNOWN,,Low,\n"
+            f"TC_Y,{self.scenario.scenario_id},,,\n"
+            f"{self.case.test_case_id},{self.scenario.scenario_id},,High,{'x' * 101}\n"
+        ).encode()
+
+        report = import_test_cases(BytesIO(content), 'cases.csv')
+
+        self.assertEqual((report['rows'], report['updated'], report['error_count']), (5, 1, 4))
+        self.assertEqual([error['row'] for error in report['errors']], [3, 4, 5, 6])
+        self.assertIn("Unknown scenario", report['errors'][1]['error'])
+        self.assertIn("tester_name", report['errors'][3]['error'])
+        self.assertEqual(TestCaseModel.objects.get().status, 'Fail')
+
+    def test_unreadable_files(self):
+        for content, name in (
+            (b"PK\x03\x04 not really a zip", 'broken.xlsx'),
+            (b"not a zip at all", 'broken.xlsx'),
+            (b"Test Case ID,Scenario ID\n\xff\xfe,TS\n", 'latin.csv'),
+            (b"anything", 'cases.pdf'),
+        ):
+            with self.subTest(name=name, content=content):
+                response = self.upload(content, name)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+        with self.assertRaises(ImportFileError):
+            import_test_cases(BytesIO("Status\né".encode('latin-1')), 'latin.csv')
+
+    def test_command_reports_bad_files(self):
+        with NamedTemporaryFile(suffix='.xlsx') as file:
+            file.write(b"garbage")
+            file.flush()
+            with self.assertRaises(CommandError):
+                call_command('import_tcts', file.name, stdout=StringIO(), stderr=StringIO())
+
+
+SHARED_HEADER = (
+    '<nav class="site-nav"><a href="/">Home</a><a href="/login/">Log in</a></nav>'
+    '<div class="cookie-banner"><button class="accept" type="button">Accept</button></div>'
+)
+PAGES = {
+    '/': (
+        f'<html><body>{SHARED_HEADER}<h1>Home</h1>'
+        '<form id="signup" name="signup" action="/signup/"><input name="email"></form></body></html>'
+    ),
+    '/pricing/': f'<html><body>{SHARED_HEADER}<p>Plans</p><a href="/pricing/annual/">Annual</a></body></html>',
+}
+
+
+def parse(html):
+    return BeautifulSoup(html, 'html.parser')
+
+
+class ComponentDeduplicationTests(TestCase):
+    def test_signature_is_stable_across_pages(self):
+        home = parse(PAGES['/']).find('button')
+        pricing = parse(PAGES['/pricing/']).find('button')
+        self.assertEqual(element_signature('buttons', home), element_signature('buttons', pricing))
+        moved = parse(f'<body><main>{SHARED_HEADER}</main></body>').find('button')
+        self.assertNotEqual(element_signature('buttons', home), element_signature('buttons', moved))
+
+        # Same ancestry, different siblings and volatile attributes.
+        first = parse('<body><nav><a href="/a/" data-x="1">A</a></nav><p>One</p></body>').find('a')
+        second = parse('<body><p>Two</p><nav><a style="color: red" href="/a/">A</a></nav></body>').find('a')
+        self.assertEqual(
+            element_signature('links', first, 'http://shop.test/'),
+            element_signature('links', second, 'http://shop.test/x/'),
+        )
+
+    def test_relative_urls_resolve_against_the_page(self):
+        link = parse('<body><a href="/login">Log in</a></body>').find('a')
+        self.assertNotEqual(
+            element_signature('links', link, 'http://staging.test/'),
+            element_signature('links', link, 'http://shop.test/'),
+        )
+        relative = parse('<body><a href="edit/">Edit</a></body>').find('a')
+        self.assertNotEqual(
+            element_signature('links', relative, 'http://shop.test/a/'),
+            element_signature('links', relative, 'http://shop.test/b/'),
+        )
+
+    def test_components_are_shared_within_one_application(self):
+        web_application = WebApplication.objects.create(name='Shop', url='http://shop.test/')
+        other_application = WebApplication.objects.create(name='Shop copy', url='http://shop.test/')
+
+        with mock.patch('selenium.webdriver.Chrome', StaticDriver.factory(PAGES)) as driver:
+            for application in (web_application, other_application):
+                for path in PAGES:
+                    features = fetch_features_from_url(f'http://shop.test{path}', ComponentDeduplicator(application))
+                    store_features_in_db(application, features)
+
+        for application in (web_application, other_application):
+            scenarios = TestScenario.objects.filter(web_application=application)
+            # Two header links, the cookie button, the form and the annual link.
+            self.assertEqual(scenarios.count(), 5)
+            self.assertEqual(get_stats(application)['total'], 5)
+            self.assertEqual(Feature.objects.filter(web_application=application).count(), 8)
+            # Every feature of the application resolves to one of its scenarios.
+            for feature in Feature.objects.filter(web_application=application):
+                self.assertTrue(scenarios.filter(feature__component=feature.component_id).exists())
+        # Shared header elements are only interacted with on the first page.
+        self.assertEqual(driver.counters['interactions'], 10)
+
+
+class ResumableCrawlTests(TestCase):
+    def setUp(self):
+        self.web_application = WebApplication.objects.create(name='Shop', url='http://shop.test/')
+        self.job = CrawlJob.objects.create(web_application=self.web_application, url=self.web_application.url)
+        self.driver = StaticDriver.factory(PAGES)
+
+    def crawl(self, **kwargs):
+        with mock.patch('selenium.webdriver.Chrome', self.driver):
+            return run_crawl(CrawlJob.objects.get(pk=self.job.pk), checkpoint_every=1, **kwargs)
+
+    def assertCrawledOnce(self):
+        features = Feature.objects.filter(web_application=self.web_application)
+        # Two header links, the cookie button and the form of the home page.
+        self.assertEqual(features.count(), 4)
+        self.assertEqual(len(set(features.values_list('idempotency_key', flat=True))), 4)
+        self.assertEqual(TestScenario.objects.filter(web_application=self.web_application).count(), 4)
+        self.assertEqual(get_stats(self.web_application)['total'], 4)
+
+    def test_resume_after_crash(self):
+        locate = crawl._locate
+        calls = []
+
+        def crash_on_third(*args):
+            calls.append(args)
+            if len(calls) == 3:
+                raise RuntimeError("browser crashed")
+            return locate(*args)
+
+        with mock.patch('web_api.crawl._locate', crash_on_third):
+            with self.assertRaises(RuntimeError):
+                self.crawl()
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, self.job.processed, self.job.error), ('failed', 2, "browser crashed"))
+        # Checkpointed features are stored, not kept in the job.
+        self.assertEqual(self.job.results, {})
+
+        self.assertEqual(self.crawl().status, 'completed')
+        self.assertCrawledOnce()
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.results, self.job.frontier), ({}, []))
+
+    def test_replayed_checkpoint_does_not_duplicate(self):
+        store = crawl.store_feature
+        stored = []
+
+        def crash_after_storing(*args):
+            stored.append(store(*args))
+            if len(stored) == 2:
+                raise RuntimeError("killed before the checkpoint was saved")
+
+        with mock.patch('web_api.crawl.store_feature', crash_after_storing):
+            with self.assertRaises(RuntimeError):
+                self.crawl()
+
+        self.crawl()
+        self.assertCrawledOnce()
+
+    def test_browser_that_fails_to_start_fails_the_job(self):
+        self.driver = mock.Mock(side_effect=WebDriverException("chromedriver not found"))
+        with self.assertRaises(WebDriverException):
+            self.crawl()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'failed')
+        self.assertIn("chromedriver not found", self.job.error)
+
+    def test_running_jobs_are_leased(self):
+        CrawlJob.objects.filter(pk=self.job.pk).update(status='running', updated_at=timezone.now())
+        self.assertFalse(crawl.resumable_jobs().exists())
+        self.assertIsNone(crawl.claim(self.job.pk))
+
+        stale = timezone.now() - timedelta(seconds=crawl.STALE_AFTER_SECONDS + 1)
+        CrawlJob.objects.filter(pk=self.job.pk).update(updated_at=stale)
+        self.assertEqual(crawl.claim(self.job.pk), self.job)
+        # The claim renewed the lease, so a second process gets nothing.
+        self.assertIsNone(crawl.claim(self.job.pk))
+
+        with self.assertRaises(CommandError):
+            call_command('resume_crawls', self.job.pk, stdout=StringIO())
+
+    def test_started_jobs_are_not_resumable(self):
+        def check_not_resumable(job, **kwargs):
+            self.assertFalse(crawl.resumable_jobs().filter(pk=job.pk).exists())
+            return job
+
+        with mock.patch('web_api.crawl.run_crawl', check_not_resumable):
+            job = crawl.start_crawl(self.web_application)
+        self.assertEqual(job.status, 'running')
+
+    def test_missing_case_of_shared_component_is_generated(self):
+        with mock.patch('selenium.webdriver.Chrome', self.driver):
+            features = fetch_features_from_url(self.web_application.url, ComponentDeduplicator(self.web_application))
+            store_features_in_db(self.web_application, features)
+            button = TestScenario.objects.get(feature__name='Buttons')
+            button.test_cases.all().delete()
+
+            shared = ComponentDeduplicator(self.web_application).split(
+                'buttons', parse(PAGES['/pricing/']).find_all('button'), 'http://shop.test/pricing/'
+            )[2]
+            store_feature(self.web_application, 'buttons', shared[0])
+
+        self.assertEqual(button.test_cases.count(), 1)
+        self.assertEqual(TestScenario.objects.filter(feature__name='Buttons').count(), 1)
@@ -4,11 +4,14 @@ from .views import (
                     WebApplicationCreateAPIView,
                     WebApplicationListAPIView,
                     WebApplicationDetailAPIView,
+                    WebApplicationStatsAPIView,
                     TestScenarioListAPIView,
                     TestScenarioDetailAPIView,
                     TestCaseListAPIView,
                     TestCaseDetailAPIView,
                     ExportTCTSView,
+                    ImportTCTSView,
+                    SearchAPIView,
                     )
 
 urlpatterns = [
@@ -16,6 +19,7 @@ urlpatterns = [
     path('api/web-applications/', WebApplicationCreateAPIView.as_view(), name='web-application-create'),
     path('api/web-applications/list/', WebApplicationListAPIView.as_view(), name='web-application-list'),
     path('api/web-applications/<int:id>/', WebApplicationDetailAPIView.as_view(), name='web-application-detail'),
+    path('api/web-applications/<int:id>/stats/', WebApplicationStatsAPIView.as_view(), name='web-application-stats'),
     # TestScenario URLs
     path('test_scenarios/', TestScenarioListAPIView.as_view(), name='test-scenario-list'),
     path('test_scenarios/<int:id>/', TestScenarioDetailAPIView.as_view(), name='test-scenario-detail'),
@@ -25,4 +29,9 @@ urlpatterns = [
     
     # Export in Excel file
     path('export-tcts/', ExportTCTSView.as_view(), name='export-tcts'),
+    # Import an edited Excel/CSV export
+    path('import-tcts/', ImportTCTSView.as_view(), name='import-tcts'),
+
+    # Full-text search over test cases and scenarios
+    path('search/', SearchAPIView.as_view(), name='search'),
 ]
@@ -2,12 +2,15 @@ from rest_framework import generics
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.parsers import MultiPartParser
 from django.views.generic import TemplateView
 from django.http import HttpResponse
 from .models import WebApplication, TestScenario, TestCase
 from .serializers import WebApplicationSerializer, TestScenarioSerializer, TestCaseSerializer
-from .utils import fetch_features_from_url, store_features_in_db, generate_test_scenarios_and_cases_excel
-# Create your views here.
+from .stats import get_stats
+from .search import TEST_CASE, TEST_SCENARIO, get_search_backend
+# The crawler (selenium, bs4) and Excel (openpyxl) engines are imported inside
+# the views that use them, so workers serving only the read API never load them.
 
 
 class HomePageView(TemplateView):
@@ -25,9 +28,9 @@ class WebApplicationCreateAPIView(APIView):
         # Create a new WebApplication entry
         web_application = WebApplication.objects.create(name=name, url=url)
 
-        # Extract features from the web application
-        features = fetch_features_from_url(url)
-        store_features_in_db(web_application, features)
+        # Extract features from the web application in a resumable crawl
+        from .crawl import start_crawl
+        start_crawl(web_application)
 
         serializer = WebApplicationSerializer(web_application)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -44,6 +47,19 @@ class WebApplicationDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
     lookup_field = 'id'
 
 
+class WebApplicationStatsAPIView(APIView):
+    def get(self, request, id):
+        """
+        Returns test case counts by status, priority and type for a web application.
+        """
+        try:
+            web_application = WebApplication.objects.get(id=id)
+        except WebApplication.DoesNotExist:
+            return Response({"error": "Web application not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({"web_application": web_application.id, **get_stats(web_application)})
+
+
 class TestScenarioListAPIView(generics.ListAPIView):
     queryset = TestScenario.objects.all()
     serializer_class = TestScenarioSerializer
@@ -73,6 +89,8 @@ class ExportTCTSView(APIView):
         Query Parameters:
         - web_app_id (optional): ID of the web application to filter by.
         """
+        from .exporter import generate_test_scenarios_and_cases_excel
+
         web_app_id = request.GET.get('web_app_id', None)
 
         try:
@@ -97,4 +115,89 @@ class ExportTCTSView(APIView):
             return response
 
         except WebApplication.DoesNotExist:
-            return Response({"error": "Web application not found."}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+            return Response({"error": "Web application not found."}, status=status.HTTP_404_NOT_FOUND)
+
+
+class ImportTCTSView(APIView):
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        """
+        Updates test scenarios and test cases from an edited export.
+        Form Data:
+        - file: .xlsx workbook or .csv sheet in the export's column layout.
+        """
+        from .importer import ImportFileError, import_test_cases
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "A 'file' upload is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            report = import_test_cases(upload, upload.name)
+        except ImportFileError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class SearchAPIView(APIView):
+    max_page_size = 100
+
+    def get(self, request):
+        """
+        Full-text search over test case and test scenario text, best matches first
+        where the backend ranks them.
+        Query Parameters:
+        - q: search terms; every term must match, the last one as a prefix.
+        - web_app_id (optional): ID of the web application to filter by.
+        - type (optional): 'test_case' or 'test_scenario'.
+        - page, page_size (optional): 1-based page number and results per page.
+        ``count`` stops at the backend's count limit; ``count_capped`` tells when it did.
+        Such queries are only ranked within their most recent ``count`` matches, which
+        ``ranking_capped`` reports; narrow the query to rank over all of its matches.
+        """
+        query = request.GET.get('q', '').strip()
+        kind = request.GET.get('type') or None
+        if not query:
+            return Response({"error": "The 'q' parameter is required."}, status=status.HTTP_400_BAD_REQUEST)
+        if kind not in (None, TEST_CASE, TEST_SCENARIO):
+            return Response({"error": "Type must be 'test_case' or 'test_scenario'."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            web_app_id = request.GET.get('web_app_id')
+            web_app_id = int(web_app_id) if web_app_id else None
+            page = max(int(request.GET.get('page', 1)), 1)
+            page_size = min(max(int(request.GET.get('page_size', 20)), 1), self.max_page_size)
+        except ValueError:
+            return Response({"error": "web_app_id, page and page_size must be integers."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        backend = get_search_backend()
+        count, hits = backend.search(
+            query, web_application_id=web_app_id, kind=kind, offset=(page - 1) * page_size, limit=page_size
+        )
+
+        # Load the matched rows with one query per type.
+        test_cases = TestCase.objects.in_bulk([hit['id'] for hit in hits if hit['type'] == TEST_CASE])
+        test_scenarios = TestScenario.objects.in_bulk([hit['id'] for hit in hits if hit['type'] == TEST_SCENARIO])
+        results = []
+        for hit in hits:
+            if hit['type'] == TEST_CASE and hit['id'] in test_cases:
+                hit['object'] = TestCaseSerializer(test_cases[hit['id']]).data
+            elif hit['type'] == TEST_SCENARIO and hit['id'] in test_scenarios:
+                hit['object'] = TestScenarioSerializer(test_scenarios[hit['id']]).data
+            else:
+                continue
+            results.append(hit)
+
+        # Counts past the backend's limit are not computed, only flagged.
+        capped = count > backend.count_limit
+        return Response({
+            "count": min(count, backend.count_limit),
+            "count_capped": capped,
+            "ranking_capped": capped and backend.ranking_capped,
+            "page": page,
+            "page_size": page_size,
+            "results": results,
+        })